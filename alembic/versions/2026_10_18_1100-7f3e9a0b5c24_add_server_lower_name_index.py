@@ -0,0 +1,35 @@
+"""add server lower name index
+
+Revision ID: 7f3e9a0b5c24
+Revises: d42a6b9e1c08
+Create Date: 2026-10-18 11:00:41.503127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7f3e9a0b5c24'
+down_revision = 'd42a6b9e1c08'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    duplicates = op.get_bind().execute(sa.text(
+        'SELECT lower(name), array_agg(name ORDER BY id) FROM server '
+        'GROUP BY lower(name) HAVING count(*) > 1'
+    )).all()
+    if duplicates:
+        names = '; '.join(', '.join(names) for _, names in duplicates)
+        raise RuntimeError(f'Rename servers whose names differ only by case first: {names}')
+    with op.get_context().autocommit_block():
+        # Left invalid by a build that failed on a duplicate inserted meanwhile
+        op.drop_index('uq_server_lower_name', table_name='server', postgresql_concurrently=True, if_exists=True)
+        op.create_index('uq_server_lower_name', 'server', [sa.text('lower(name)')], unique=True, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('uq_server_lower_name', table_name='server', postgresql_concurrently=True)
@@ -0,0 +1,35 @@
+"""add keyword search
+
+Revision ID: e9a17c4d2b63
+Revises: b6d0c3f81e42
+Create Date: 2026-10-18 12:00:27.391846
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e9a17c4d2b63'
+down_revision = 'b6d0c3f81e42'
+branch_labels = None
+depends_on = None
+
+# Must match weighted_search_vector in the models, so lookups can use the indexes
+SEARCH_VECTOR = "(setweight(to_tsvector('english', name), 'A') || setweight(to_tsvector('english', description), 'B'))"
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # Expression indexes, so neither table is rewritten, built without blocking writes
+    with op.get_context().autocommit_block():
+        op.create_index('ix_server_search_vector', 'server', [sa.text(SEARCH_VECTOR)], unique=False, postgresql_using='gin', postgresql_concurrently=True)
+        op.create_index('ix_server_name_trgm', 'server', ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}, postgresql_concurrently=True)
+        op.create_index('ix_tool_search_vector', 'tool', [sa.text(SEARCH_VECTOR)], unique=False, postgresql_using='gin', postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tool_search_vector', table_name='tool', postgresql_concurrently=True)
+        op.drop_index('ix_server_name_trgm', table_name='server', postgresql_concurrently=True)
+        op.drop_index('ix_server_search_vector', table_name='server', postgresql_concurrently=True)
@@ -0,0 +1,27 @@
+"""add tool server url index
+
+Revision ID: 4c8e2f9a7d15
+Revises: e9a17c4d2b63
+Create Date: 2026-10-18 12:30:05.862417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c8e2f9a7d15'
+down_revision = 'e9a17c4d2b63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Built concurrently so that a large tool table stays writable
+    with op.get_context().autocommit_block():
+        op.create_index(op.f('ix_tool_server_url'), 'tool', ['server_url'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_tool_server_url'), table_name='tool', postgresql_concurrently=True)
@@ -0,0 +1,86 @@
+"""use server id for tools
+
+Revision ID: 8d2b5e7f1a36
+Revises: 4c8e2f9a7d15
+Create Date: 2026-10-18 13:00:48.207519
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2b5e7f1a36'
+down_revision = '4c8e2f9a7d15'
+branch_labels = None
+depends_on = None
+
+# Rows updated per transaction while backfilling, to keep row locks short
+BATCH_SIZE = 10000
+
+# Keeps server_id and server_url in step while old and new code run side by
+# side; dropped with server_url by the contract revision f5b8e2a4c7d9
+SYNC_FUNCTION = """
+CREATE FUNCTION tool_sync_server_ref() RETURNS trigger AS $$
+BEGIN
+    IF NEW.server_id IS NULL THEN
+        SELECT id INTO NEW.server_id FROM server WHERE url = NEW.server_url;
+    ELSIF NEW.server_url IS NULL THEN
+        SELECT url INTO NEW.server_url FROM server WHERE id = NEW.server_id;
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+SYNC_TRIGGER = (
+    'CREATE TRIGGER tool_sync_server_ref BEFORE INSERT OR UPDATE OF server_id, server_url ON tool '
+    'FOR EACH ROW EXECUTE FUNCTION tool_sync_server_ref()'
+)
+
+
+def backfill(statement):
+    connection = op.get_bind()
+    while connection.execute(sa.text(statement), dict(batch_size=BATCH_SIZE)).rowcount:
+        pass
+
+
+def upgrade():
+    op.add_column('tool', sa.Column('server_id', sa.Integer(), nullable=True))
+    # New code inserts server_id only, the trigger fills server_url for old code
+    op.alter_column('tool', 'server_url', nullable=True)
+    op.execute(SYNC_FUNCTION)
+    op.execute(SYNC_TRIGGER)
+    # Url changes made by new code carry over to the tools old code reads
+    op.create_foreign_key('tool_server_url_cascade_fkey', 'tool', 'server', ['server_url'], ['url'], onupdate='CASCADE', ondelete='CASCADE', postgresql_not_valid=True)
+    with op.get_context().autocommit_block():
+        op.execute('ALTER TABLE tool VALIDATE CONSTRAINT tool_server_url_cascade_fkey')
+    op.drop_constraint('tool_server_url_fkey', 'tool', type_='foreignkey')
+    with op.get_context().autocommit_block():
+        backfill(
+            'UPDATE tool SET server_id = server.id FROM server '
+            'WHERE tool.id IN (SELECT id FROM tool WHERE server_id IS NULL LIMIT :batch_size) '
+            'AND server.url = tool.server_url'
+        )
+        op.create_index('uq_tool_server_id_name', 'tool', ['server_id', 'name'], unique=True, postgresql_concurrently=True)
+    op.execute('ALTER TABLE tool ADD CONSTRAINT uq_tool_server_id_name UNIQUE USING INDEX uq_tool_server_id_name')
+    op.create_foreign_key('tool_server_id_fkey', 'tool', 'server', ['server_id'], ['id'], ondelete='CASCADE', postgresql_not_valid=True)
+    op.create_check_constraint('tool_server_id_not_null', 'tool', 'server_id IS NOT NULL', postgresql_not_valid=True)
+    with op.get_context().autocommit_block():
+        op.execute('ALTER TABLE tool VALIDATE CONSTRAINT tool_server_id_fkey')
+        op.execute('ALTER TABLE tool VALIDATE CONSTRAINT tool_server_id_not_null')
+    # The validated check constraint lets SET NOT NULL skip the table scan
+    op.alter_column('tool', 'server_id', nullable=False)
+    op.drop_constraint('tool_server_id_not_null', 'tool', type_='check')
+
+
+def downgrade():
+    op.execute('DROP TRIGGER tool_sync_server_ref ON tool')
+    op.execute('DROP FUNCTION tool_sync_server_ref()')
+    op.drop_constraint('uq_tool_server_id_name', 'tool', type_='unique')
+    op.drop_constraint('tool_server_id_fkey', 'tool', type_='foreignkey')
+    op.drop_column('tool', 'server_id')
+    op.create_foreign_key('tool_server_url_fkey', 'tool', 'server', ['server_url'], ['url'], ondelete='CASCADE', postgresql_not_valid=True)
+    with op.get_context().autocommit_block():
+        op.execute('ALTER TABLE tool VALIDATE CONSTRAINT tool_server_url_fkey')
+    op.drop_constraint('tool_server_url_cascade_fkey', 'tool', type_='foreignkey')
+    op.alter_column('tool', 'server_url', nullable=False)
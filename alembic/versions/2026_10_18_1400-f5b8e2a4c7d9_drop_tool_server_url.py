@@ -0,0 +1,72 @@
+"""drop tool server url
+
+Revision ID: f5b8e2a4c7d9
+Revises: 3a6c9d1e5f70
+Create Date: 2026-10-18 14:00:36.802417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f5b8e2a4c7d9'
+down_revision = '3a6c9d1e5f70'
+branch_labels = None
+depends_on = None
+
+# Rows updated per transaction while backfilling, to keep row locks short
+BATCH_SIZE = 10000
+
+# As created by 8d2b5e7f1a36, restored on downgrade
+SYNC_FUNCTION = """
+CREATE FUNCTION tool_sync_server_ref() RETURNS trigger AS $$
+BEGIN
+    IF NEW.server_id IS NULL THEN
+        SELECT id INTO NEW.server_id FROM server WHERE url = NEW.server_url;
+    ELSIF NEW.server_url IS NULL THEN
+        SELECT url INTO NEW.server_url FROM server WHERE id = NEW.server_id;
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+SYNC_TRIGGER = (
+    'CREATE TRIGGER tool_sync_server_ref BEFORE INSERT OR UPDATE OF server_id, server_url ON tool '
+    'FOR EACH ROW EXECUTE FUNCTION tool_sync_server_ref()'
+)
+
+
+def backfill(statement):
+    connection = op.get_bind()
+    while connection.execute(sa.text(statement), dict(batch_size=BATCH_SIZE)).rowcount:
+        pass
+
+
+def upgrade():
+    # Contract step: only run once no instance of the previous release is left
+    op.execute('DROP TRIGGER tool_sync_server_ref ON tool')
+    op.execute('DROP FUNCTION tool_sync_server_ref()')
+    op.drop_constraint('uq_tool_name_server_url', 'tool', type_='unique')
+    op.drop_constraint('tool_server_url_cascade_fkey', 'tool', type_='foreignkey')
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tool_server_url', table_name='tool', postgresql_concurrently=True)
+    op.drop_column('tool', 'server_url')
+
+
+def downgrade():
+    op.add_column('tool', sa.Column('server_url', sa.String(), nullable=True))
+    op.execute(SYNC_FUNCTION)
+    op.execute(SYNC_TRIGGER)
+    with op.get_context().autocommit_block():
+        backfill(
+            'UPDATE tool SET server_url = server.url FROM server '
+            'WHERE tool.id IN (SELECT id FROM tool WHERE server_url IS NULL LIMIT :batch_size) '
+            'AND server.id = tool.server_id'
+        )
+        op.create_index('ix_tool_server_url', 'tool', ['server_url'], unique=False, postgresql_concurrently=True)
+        op.create_index('uq_tool_name_server_url', 'tool', ['name', 'server_url'], unique=True, postgresql_concurrently=True)
+    op.execute('ALTER TABLE tool ADD CONSTRAINT uq_tool_name_server_url UNIQUE USING INDEX uq_tool_name_server_url')
+    op.create_foreign_key('tool_server_url_cascade_fkey', 'tool', 'server', ['server_url'], ['url'], onupdate='CASCADE', ondelete='CASCADE', postgresql_not_valid=True)
+    with op.get_context().autocommit_block():
+        op.execute('ALTER TABLE tool VALIDATE CONSTRAINT tool_server_url_cascade_fkey')
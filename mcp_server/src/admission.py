@@ -0,0 +1,125 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from uuid import uuid4
+from weakref import WeakKeyDictionary
+
+from mcp.server.fastmcp import Context
+from mcp.server.session import ServerSession
+
+from mcp_server.src.logger import logger
+from mcp_server.src.metrics import ADMISSION_REJECTED
+from mcp_server.src.metrics import ADMISSION_REQUESTS
+from mcp_server.src.settings import settings
+
+
+class TooManyRequestsError(Exception):
+    def __init__(self, message: str, retry_after: int) -> None:
+        super().__init__(f"{message}, retry after {retry_after} seconds")
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """Per-client token buckets, forgetting the least recently seen clients."""
+
+    def __init__(self, rate: float, burst: int, max_clients: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self.buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def acquire(self, client: str) -> float:
+        """Take a token, or return the seconds until the client gets one."""
+        now = time.monotonic()
+        tokens, updated = self.buckets.pop(client, (float(self.burst), now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        retry_after = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / self.rate
+        self.buckets[client] = (tokens, now)
+        if len(self.buckets) > self.max_clients:
+            self.buckets.popitem(last=False)
+        return retry_after
+
+
+class AdmissionController:
+    """Bound concurrent tool calls, queueing a limited number of callers."""
+
+    def __init__(self, limit: int, queue_size: int, queue_timeout: float) -> None:
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.semaphore = asyncio.Semaphore(limit)
+        self.in_flight = 0
+        self.waiting = 0
+        self.average_duration = 1.0
+        ADMISSION_REQUESTS.labels("in_flight").set_function(lambda: self.in_flight)
+        ADMISSION_REQUESTS.labels("waiting").set_function(lambda: self.waiting)
+
+    def _reject(self, reason: str) -> TooManyRequestsError:
+        ADMISSION_REJECTED.labels(reason).inc()
+        logger.warning(f"Rejected tool call {reason=} {self.waiting=}")
+        retry_after = math.ceil(self.average_duration * (self.waiting + 1) / self.limit)
+        return TooManyRequestsError("Server is overloaded", retry_after)
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        if not self.semaphore.locked():
+            # Does not suspend, so the slot is taken before the next caller checks
+            await self.semaphore.acquire()
+        elif self.waiting >= self.queue_size:
+            raise self._reject("queue_full")
+        else:
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self.semaphore.acquire(), self.queue_timeout)
+            except TimeoutError:
+                raise self._reject("queue_timeout") from None
+            finally:
+                self.waiting -= 1
+        self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self.semaphore.release()
+            duration = time.perf_counter() - started
+            self.average_duration = 0.9 * self.average_duration + 0.1 * duration
+
+
+tool_admission = AdmissionController(
+    limit=settings.tool_concurrency,
+    queue_size=settings.tool_queue_size,
+    queue_timeout=settings.tool_queue_timeout,
+)
+client_rate_limiter = RateLimiter(
+    rate=settings.client_rate_limit,
+    burst=settings.client_rate_burst,
+    max_clients=settings.client_rate_clients,
+)
+
+
+# Ids generated per SSE session, as clients choose their own `client_id`
+session_ids: WeakKeyDictionary[ServerSession, str] = WeakKeyDictionary()
+
+
+def get_client(ctx: Context) -> str:
+    """Rate limit key of the caller, also forwarded to the registry."""
+    if (client := session_ids.get(ctx.session)) is None:
+        client = session_ids[ctx.session] = uuid4().hex
+    return client
+
+
+@asynccontextmanager
+async def admit_tool_call(ctx: Context) -> AsyncIterator[None]:
+    if (retry_after := client_rate_limiter.acquire(get_client(ctx))) > 0:
+        ADMISSION_REJECTED.labels("rate_limited").inc()
+        raise TooManyRequestsError("Rate limit exceeded", math.ceil(retry_after))
+    async with tool_admission.admit():
+        yield
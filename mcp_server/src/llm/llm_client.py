@@ -1,3 +1,5 @@
+import time
+
 from httpx import AsyncClient
 from openai import APIError
 from openai import AsyncOpenAI
@@ -9,7 +11,10 @@ from openai.types.chat import ChatCompletionMessageParam
 from openai.types.chat import ChatCompletionToolParam
 
 from mcp_server.src.logger import logger
+from mcp_server.src.metrics import count_tokens
+from mcp_server.src.metrics import LLM_REQUEST_DURATION
 from mcp_server.src.settings import settings
+from mcp_server.src.tracing import tracer
 
 default_http_client: AsyncClient = (
     AsyncClient()
@@ -53,14 +58,25 @@ class LLMClient:
         full_messages = self._get_full_messages(
             system_prompt=system_prompt, messages=messages
         )
+        started = time.perf_counter()
         try:
-            response = await self.openai_client.chat.completions.create(
-                model=model,
-                messages=full_messages,
-                max_tokens=max_tokens,
-                tools=tools or NOT_GIVEN,
-                timeout=30,
-            )
+            with tracer.start_as_current_span(
+                "llm.request", attributes={"llm.model": model}
+            ) as span:
+                response = await self.openai_client.chat.completions.create(
+                    model=model,
+                    messages=full_messages,
+                    max_tokens=max_tokens,
+                    tools=tools or NOT_GIVEN,
+                    timeout=30,
+                )
+                if response.usage is not None:
+                    span.set_attribute(
+                        "llm.prompt_tokens", response.usage.prompt_tokens
+                    )
+                    span.set_attribute(
+                        "llm.completion_tokens", response.usage.completion_tokens
+                    )
         except APIError as error:
             logger.error(f"{error.code=} {error.body=}")
             raise
@@ -72,4 +88,7 @@ class LLMClient:
                 f"Request to Provider failed with the following exception:\n{error}"
             )
             raise
+        finally:
+            LLM_REQUEST_DURATION.labels(model).observe(time.perf_counter() - started)
+        count_tokens(model, response.usage)
         return response
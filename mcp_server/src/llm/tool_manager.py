@@ -7,8 +7,11 @@ from openai.types.chat import ChatCompletionMessageToolCall
 from openai.types.chat import ChatCompletionToolMessageParam
 from openai.types.chat import ChatCompletionToolParam
 
+from mcp_server.src.metrics import SERVER_CALL_DURATION
+from mcp_server.src.metrics import SERVER_CALL_ERRORS
 from mcp_server.src.schemas import RegistryServer
 from mcp_server.src.schemas import ToolInfo
+from mcp_server.src.tracing import tracer
 
 
 class ToolManager:
@@ -41,14 +44,26 @@ class ToolManager:
         server_url: str,
         tool_name: str,
     ) -> CallToolResult:
-        async with sse_client(server_url) as (read, write):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
+        with (
+            SERVER_CALL_DURATION.labels(server_url).time(),
+            SERVER_CALL_ERRORS.labels(server_url).count_exceptions(),
+            tracer.start_as_current_span(
+                "mcp.call_tool",
+                attributes={"mcp.server_url": server_url, "mcp.tool_name": tool_name},
+            ) as span,
+        ):
+            async with sse_client(server_url) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
 
-                return await session.call_tool(
-                    tool_name,
-                    arguments=(json.loads(arguments) if arguments else None),
-                )
+                    result = await session.call_tool(
+                        tool_name,
+                        arguments=(json.loads(arguments) if arguments else None),
+                    )
+            span.set_attribute("mcp.is_error", result.isError)
+        if result.isError:
+            SERVER_CALL_ERRORS.labels(server_url).inc()
+        return result
 
     async def handle_tool_call(
         self, tool_call: ChatCompletionMessageToolCall
@@ -1,6 +1,13 @@
+from mcp.server.fastmcp import Context
 from mcp.server.fastmcp import FastMCP
+from prometheus_client import start_http_server
 
+from .admission import admit_tool_call
+from .admission import get_client
+from .metrics import TOOL_DURATION
+from .metrics import TOOL_ERRORS
 from .schemas import RoutingResponse
+from .tracing import tracer
 from mcp_server.src.settings import settings
 from mcp_server.src.tools import Tools
 
@@ -10,19 +17,33 @@ tools: Tools = Tools()
 
 
 @mcp.tool()
-async def search_urls(request: str) -> list[str]:
+async def search_urls(request: str, ctx: Context) -> list[str]:
     """Return URLs of the best MCP servers for processing the given request."""
-    return await tools.search(request=request)
+    with (
+        TOOL_DURATION.labels("search_urls").time(),
+        TOOL_ERRORS.labels("search_urls").count_exceptions(),
+        tracer.start_as_current_span("tool.search_urls"),
+    ):
+        async with admit_tool_call(ctx):
+            return await tools.search(request=request, client=get_client(ctx))
 
 
 @mcp.tool()
 async def routing(
     request: str,
+    ctx: Context,
 ) -> str:
     """Respond to any user request using MCP tools selected specifically for it."""
-    response = await tools.routing(request=request)
+    with (
+        TOOL_DURATION.labels("routing").time(),
+        TOOL_ERRORS.labels("routing").count_exceptions(),
+        tracer.start_as_current_span("tool.routing"),
+    ):
+        async with admit_tool_call(ctx):
+            response = await tools.routing(request=request, client=get_client(ctx))
     return RoutingResponse(conversation=response).model_dump_json()
 
 
 if __name__ == "__main__":
+    start_http_server(settings.metrics_port)
     mcp.run(transport="sse")
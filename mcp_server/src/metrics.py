@@ -0,0 +1,52 @@
+from openai.types import CompletionUsage
+from prometheus_client import Counter
+from prometheus_client import Gauge
+from prometheus_client import Histogram
+
+TOOL_DURATION = Histogram(
+    "mcp_tool_duration_seconds",
+    "Latency of the tools this server exposes",
+    ["tool"],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120),
+)
+TOOL_ERRORS = Counter(
+    "mcp_tool_errors_total", "Failed calls of the tools this server exposes", ["tool"]
+)
+REGISTRY_REQUEST_DURATION = Histogram(
+    "mcp_registry_request_duration_seconds",
+    "Latency of registry search requests",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 90),
+)
+LLM_REQUEST_DURATION = Histogram(
+    "mcp_llm_request_duration_seconds",
+    "Latency of LLM completion requests",
+    ["model"],
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 15, 30),
+)
+LLM_TOKENS = Counter("mcp_llm_tokens_total", "LLM tokens used", ["model", "kind"])
+SERVER_CALL_DURATION = Histogram(
+    "mcp_server_call_duration_seconds",
+    "Latency of tool calls made to registered MCP servers",
+    ["server"],
+    buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60),
+)
+SERVER_CALL_ERRORS = Counter(
+    "mcp_server_call_errors_total",
+    "Failed tool calls made to registered MCP servers",
+    ["server"],
+)
+ADMISSION_REQUESTS = Gauge(
+    "mcp_admission_requests",
+    "Tool calls holding or waiting for an admission slot",
+    ["state"],
+)
+ADMISSION_REJECTED = Counter(
+    "mcp_admission_rejected_total", "Tool calls rejected by reason", ["reason"]
+)
+
+
+def count_tokens(model: str, usage: CompletionUsage | None) -> None:
+    if usage is None:
+        return
+    LLM_TOKENS.labels(model, "prompt").inc(usage.prompt_tokens)
+    LLM_TOKENS.labels(model, "completion").inc(usage.completion_tokens)
@@ -1,7 +1,14 @@
 from httpx import AsyncClient
+from opentelemetry.propagate import inject
 
+from mcp_server.src.admission import TooManyRequestsError
+from mcp_server.src.metrics import REGISTRY_REQUEST_DURATION
 from mcp_server.src.schemas import RegistryServer
 from mcp_server.src.settings import settings
+from mcp_server.src.tracing import tracer
+
+# Read by the registry from the networks in its SEARCH_TRUSTED_NETWORKS
+CLIENT_ID_HEADER = "X-Client-Id"
 
 
 class RegistryClient:
@@ -9,10 +16,25 @@ class RegistryClient:
         self.client = AsyncClient(base_url=settings.registry_url)
         self.timeout = 90
 
-    async def search(self, request: str) -> list[RegistryServer]:
-        response = await self.client.get(
-            "/servers/search", params=dict(query=request), timeout=self.timeout
-        )
+    async def search(self, request: str, client: str) -> list[RegistryServer]:
+        """Search on behalf of an MCP client, which the registry rate limits."""
+        with (
+            REGISTRY_REQUEST_DURATION.time(),
+            tracer.start_as_current_span("registry.search") as span,
+        ):
+            headers = {CLIENT_ID_HEADER: client}
+            inject(headers)
+            response = await self.client.get(
+                "/servers/search",
+                params=dict(query=request),
+                headers=headers,
+                timeout=self.timeout,
+            )
+            span.set_attribute("http.status_code", response.status_code)
+        if response.status_code == 429:
+            raise TooManyRequestsError(
+                "Registry is overloaded", int(response.headers.get("Retry-After", 1))
+            )
         assert (
             response.status_code == 200
         ), f"{response.status_code=} {response.content=}"
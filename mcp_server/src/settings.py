@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Literal
 
 from pydantic import BaseModel
 from pydantic import Field
@@ -27,7 +28,15 @@ class Settings(BaseSettings):
 
     registry_url: str = "http://registry:80"
     log_dir: Path = Path("logs")
+    trace_exporter: Literal["file", "memory", "none"] = "file"
     mcp_port: int = 80
+    metrics_port: int = 9090
+    tool_concurrency: int = 16
+    tool_queue_size: int = 32
+    tool_queue_timeout: float = 30.0
+    client_rate_limit: float = 1.0
+    client_rate_burst: int = 5
+    client_rate_clients: int = 10000
     llm_proxy: str | None = None
     openai_api_base: str = "https://api.openai.com/v1"
     openai_api_key: str
@@ -0,0 +1,55 @@
+import asyncio
+import re
+import unicodedata
+from collections.abc import Callable
+from collections.abc import Coroutine
+from typing import Any
+from typing import Generic
+from typing import TypeVar
+
+from mcp_server.src.logger import logger
+
+T = TypeVar("T")
+
+
+def normalize_request(request: str) -> str:
+    text = unicodedata.normalize("NFKC", request).casefold()
+    return " ".join(re.findall(r"[^\W_]+", text))
+
+
+class SingleFlight(Generic[T]):
+    """Coalesce concurrent calls with the same key into one shared task.
+
+    Waiters are shielded from the shared task, so a cancelled caller does not
+    cancel the work for the remaining ones.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.calls: dict[str, asyncio.Task[T]] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def _forget(self, key: str, task: asyncio.Task[T]) -> None:
+        if self.calls.get(key) is task:
+            del self.calls[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved when every waiter has gone away
+            task.exception()
+
+    async def run(self, key: str, func: Callable[[], Coroutine[Any, Any, T]]) -> T:
+        if not key:
+            # Requests without words are not known to be identical
+            return await func()
+        task = self.calls.get(key)
+        if task is None:
+            task = asyncio.create_task(func())
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.calls[key] = task
+            self.started += 1
+        else:
+            self.coalesced += 1
+            logger.info(
+                f"Coalesced {self.name} request {self.coalesced=} {self.started=}"
+            )
+        return await asyncio.shield(task)
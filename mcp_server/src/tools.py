@@ -9,23 +9,44 @@ from mcp_server.src.llm.prompts import default_prompt
 from mcp_server.src.llm.tool_manager import ToolManager
 from mcp_server.src.registry_client import RegistryClient
 from mcp_server.src.settings import settings
+from mcp_server.src.single_flight import normalize_request
+from mcp_server.src.single_flight import SingleFlight
+from mcp_server.src.tracing import tracer
 
 
 class Tools:
     def __init__(self):
         self.registry_client = RegistryClient()
         self.llm_client = LLMClient()
+        self.search_flight: SingleFlight[list[str]] = SingleFlight("search")
+        self.routing_flight: SingleFlight[
+            list[ChatCompletionMessage | ChatCompletionToolMessageParam]
+        ] = SingleFlight("routing")
 
     @log_errors
-    async def search(self, request: str) -> list[str]:
-        servers = await self.registry_client.search(request=request)
+    async def search(self, request: str, client: str) -> list[str]:
+        return await self.search_flight.run(
+            normalize_request(request),
+            lambda: self._search(request=request, client=client),
+        )
+
+    async def _search(self, request: str, client: str) -> list[str]:
+        servers = await self.registry_client.search(request=request, client=client)
         return [server.url for server in servers]
 
     @log_errors
     async def routing(
-        self, request: str
+        self, request: str, client: str
     ) -> list[ChatCompletionMessage | ChatCompletionToolMessageParam]:
-        servers = await self.registry_client.search(request=request)
+        return await self.routing_flight.run(
+            normalize_request(request),
+            lambda: self._routing(request=request, client=client),
+        )
+
+    async def _routing(
+        self, request: str, client: str
+    ) -> list[ChatCompletionMessage | ChatCompletionToolMessageParam]:
+        servers = await self.registry_client.search(request=request, client=client)
         manager = ToolManager(servers)
         user_message = ChatCompletionUserMessageParam(content=request, role="user")
         resulting_conversation = await self._llm_request(
@@ -43,19 +64,23 @@ class Tools:
     ) -> list[ChatCompletionMessage | ChatCompletionToolMessageParam]:
         if response_accumulator is None:
             response_accumulator = []
-        completion = await self.llm_client.request(
-            system_prompt=default_prompt,
-            model=settings.llm_model,
-            messages=messages,
-            tools=manager.tools,
-        )
-        choice = completion.choices[0]
-        response_accumulator.append(choice.message)
-        if choice.message.tool_calls:
-            tool_calls = choice.message.tool_calls
+        with tracer.start_as_current_span(
+            "routing.turn", attributes={"routing.messages": len(messages)}
+        ) as span:
+            completion = await self.llm_client.request(
+                system_prompt=default_prompt,
+                model=settings.llm_model,
+                messages=messages,
+                tools=manager.tools,
+            )
+            choice = completion.choices[0]
+            response_accumulator.append(choice.message)
+            tool_calls = choice.message.tool_calls or []
+            span.set_attribute("routing.tool_calls", len(tool_calls))
             tool_result_messages = [
                 await manager.handle_tool_call(tool_call) for tool_call in tool_calls
             ]
+        if tool_calls:
             response_accumulator += tool_result_messages
             conversation = messages + [choice.message] + tool_result_messages
             response_accumulator = await self._llm_request(
@@ -0,0 +1,48 @@
+import threading
+from collections.abc import Sequence
+from pathlib import Path
+
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export import SpanExporter
+from opentelemetry.sdk.trace.export import SpanExportResult
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+
+from mcp_server.src.settings import settings
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """Append finished spans to a file, one JSON object per line."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = "".join(span.to_json(indent=None) + "\n" for span in spans)
+        with self.lock, self.path.open("a") as file:
+            file.write(lines)
+        return SpanExportResult.SUCCESS
+
+
+tracer_provider = TracerProvider(
+    resource=Resource.create({"service.name": "registry_mcp"})
+)
+span_exporter: SpanExporter | None = None
+
+if settings.trace_exporter == "file":
+    settings.log_dir.mkdir(parents=True, exist_ok=True)
+    span_exporter = JsonLinesSpanExporter(
+        settings.log_dir / "registry_mcp-traces.jsonl"
+    )
+    tracer_provider.add_span_processor(BatchSpanProcessor(span_exporter))
+elif settings.trace_exporter == "memory":
+    span_exporter = InMemorySpanExporter()
+    tracer_provider.add_span_processor(SimpleSpanProcessor(span_exporter))
+
+tracer = tracer_provider.get_tracer("registry_mcp")
@@ -1,11 +1,23 @@
 from .models.base import Base
+from .models.catalogue import Catalogue
+from .models.deleted_server import DeletedServer
+from .models.registration_job import RegistrationJob
+from .models.search_cache import SearchCacheEntry
 from .models.server import Server
 from .models.tool import Tool
+from .models.tool_refresh import ToolRefresh
+from .session import get_read_session
 from .session import get_session
 
 __all__ = [
     "Base",
+    "Catalogue",
+    "DeletedServer",
+    "get_read_session",
     "get_session",
+    "RegistrationJob",
+    "SearchCacheEntry",
     "Server",
     "Tool",
+    "ToolRefresh",
 ]
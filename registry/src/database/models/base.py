@@ -1,5 +1,29 @@
+from sqlalchemy import ColumnElement
+from sqlalchemy import ColumnExpressionArgument
+from sqlalchemy import func
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import DeclarativeBase
 
 
 class Base(DeclarativeBase):
     pass
+
+
+def weighted_search_vector(
+    name: ColumnExpressionArgument[str], description: ColumnExpressionArgument[str]
+) -> ColumnElement[str]:
+    """Full-text document of a name and a description, matching the GIN indexes.
+
+    Constants are inlined, as the planner only uses an expression index
+    for an identical expression.
+    """
+    return func.setweight(
+        func.to_tsvector(text("'english'"), name), text("'A'"), type_=TSVECTOR
+    ).op("||", return_type=TSVECTOR)(
+        func.setweight(
+            func.to_tsvector(text("'english'"), description),
+            text("'B'"),
+            type_=TSVECTOR,
+        )
+    )
@@ -0,0 +1,16 @@
+from sqlalchemy import BigInteger
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+
+from .base import Base
+
+
+class DeletedServer(Base):
+    """Tombstone of a deleted server, so catalogue readers can drop it."""
+
+    __tablename__ = "deleted_server"
+
+    server_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    catalogue_version: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, index=True
+    )
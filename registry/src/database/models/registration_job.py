@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime
+from sqlalchemy import ForeignKey
+from sqlalchemy import func
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+
+from .base import Base
+
+
+class RegistrationJob(Base):
+    __tablename__ = "registration_job"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    name: Mapped[str] = mapped_column(String(), nullable=False)
+    description: Mapped[str] = mapped_column(String(), nullable=False)
+    url: Mapped[str] = mapped_column(String(), nullable=False)
+    logo: Mapped[str | None] = mapped_column(String(), nullable=True)
+    status: Mapped[str] = mapped_column(String(), nullable=False, index=True)
+    attempts: Mapped[int] = mapped_column(nullable=False, default=0)
+    error: Mapped[str | None] = mapped_column(String(), nullable=True)
+    server_id: Mapped[int | None] = mapped_column(
+        ForeignKey("server.id", ondelete="SET NULL"), nullable=True
+    )
+    run_after: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
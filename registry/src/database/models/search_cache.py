@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime
+from sqlalchemy import func
+from sqlalchemy import String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+
+from .base import Base
+
+
+class SearchCacheEntry(Base):
+    __tablename__ = "search_cache"
+
+    key: Mapped[str] = mapped_column(String(), primary_key=True)
+    urls: Mapped[list[str]] = mapped_column(JSONB, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    accessed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(), index=True
+    )
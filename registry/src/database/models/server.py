@@ -1,10 +1,20 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger
+from sqlalchemy import DateTime
+from sqlalchemy import Float
+from sqlalchemy import func
+from sqlalchemy import Index
 from sqlalchemy import String
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import column_property
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
 from sqlalchemy.orm import relationship
 
 from ...database import models
 from .base import Base
+from .base import weighted_search_vector
 
 
 class Server(Base):
@@ -15,6 +25,33 @@ class Server(Base):
     name: Mapped[str] = mapped_column(String(), nullable=False, unique=True)
     description: Mapped[str] = mapped_column(String(), nullable=False)
     logo: Mapped[str | None] = mapped_column(String(), nullable=True)
+    embedding: Mapped[list[float] | None] = mapped_column(
+        ARRAY(Float), nullable=True, deferred=True
+    )
+    search_vector: Mapped[str] = column_property(
+        weighted_search_vector(name, description), deferred=True
+    )
+    # Catalogue version of the last write, for incremental catalogue refreshes
+    catalogue_version: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default="0", index=True
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
     tools: Mapped[list["models.tool.Tool"]] = relationship(
         back_populates="server", cascade="all, delete-orphan"
     )
+
+
+Index("uq_server_lower_name", func.lower(Server.name), unique=True)
+Index(
+    "ix_server_search_vector",
+    weighted_search_vector(Server.name, Server.description),
+    postgresql_using="gin",
+)
+Index(
+    "ix_server_name_trgm",
+    Server.name,
+    postgresql_using="gin",
+    postgresql_ops={"name": "gin_trgm_ops"},
+)
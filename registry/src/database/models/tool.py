@@ -1,26 +1,42 @@
+from sqlalchemy import Float
 from sqlalchemy import ForeignKey
+from sqlalchemy import Index
 from sqlalchemy import String
 from sqlalchemy import UniqueConstraint
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import column_property
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
 from sqlalchemy.orm import relationship
 
 from ...database import models
 from .base import Base
+from .base import weighted_search_vector
 
 
 class Tool(Base):
     __tablename__ = "tool"
     __table_args__ = (
-        UniqueConstraint("name", "server_url", name="uq_tool_name_server_url"),
+        UniqueConstraint("server_id", "name", name="uq_tool_server_id_name"),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String(), nullable=False)
     description: Mapped[str] = mapped_column(String(), nullable=False)
     input_schema: Mapped[dict] = mapped_column(JSONB, nullable=False)
-    server_url: Mapped[str] = mapped_column(
-        ForeignKey("server.url", ondelete="CASCADE")
+    embedding: Mapped[list[float] | None] = mapped_column(
+        ARRAY(Float), nullable=True, deferred=True
     )
+    search_vector: Mapped[str] = column_property(
+        weighted_search_vector(name, description), deferred=True
+    )
+    server_id: Mapped[int] = mapped_column(ForeignKey("server.id", ondelete="CASCADE"))
     server: Mapped["models.server.Server"] = relationship(back_populates="tools")
+
+
+Index(
+    "ix_tool_search_vector",
+    weighted_search_vector(Tool.name, Tool.description),
+    postgresql_using="gin",
+)
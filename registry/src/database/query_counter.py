@@ -0,0 +1,51 @@
+from types import TracebackType
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .session import async_engine
+
+
+class QueryBudgetExceededError(AssertionError):
+    pass
+
+
+class QueryCounter:
+    """Counts the statements an engine sends to the database.
+
+    Usage:
+        with QueryCounter() as counter:
+            await client.get("/servers?ids=1&ids=2")
+        counter.assert_at_most(3)
+    """
+
+    def __init__(self, engine: AsyncEngine = async_engine) -> None:
+        self.engine = engine.sync_engine
+        self.statements: list[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def assert_at_most(self, budget: int) -> None:
+        if self.count > budget:
+            statements = "\n".join(self.statements)
+            raise QueryBudgetExceededError(
+                f"Expected at most {budget} queries, got {self.count}:\n{statements}"
+            )
+
+    def _record(self, conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        self.statements.append(statement)
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._record)
@@ -1,25 +1,75 @@
 from collections.abc import AsyncGenerator
 from typing import Any
 
+import orjson
+from fastapi import Request
+from fastapi import Response
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.ext.asyncio import create_async_engine
 
 from registry.src.errors import FastApiError
 from registry.src.logger import logger
+from registry.src.metrics import instrument_engine
+from registry.src.metrics import TimedQueuePool
 from registry.src.settings import settings
 
+# Set on responses to writes, so that the client's next reads see them
+READ_PRIMARY_COOKIE = "read_primary"
+READ_PRIMARY_HEADER = "X-Read-Primary"
+
 async_engine = create_async_engine(
     settings.database_url_async,
     pool_size=settings.db_pool_size,
     max_overflow=settings.db_max_overflow,
     pool_pre_ping=True,
+    poolclass=TimedQueuePool,
+    json_serializer=lambda value: orjson.dumps(value).decode(),
+    json_deserializer=orjson.loads,
+)
+
+replica_engine = (
+    create_async_engine(
+        settings.database_url_replica_async,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_pre_ping=True,
+        poolclass=TimedQueuePool,
+        json_serializer=lambda value: orjson.dumps(value).decode(),
+        json_deserializer=orjson.loads,
+        isolation_level="AUTOCOMMIT",
+        connect_args=dict(server_settings=dict(default_transaction_read_only="on")),
+    )
+    if settings.database_url_replica_async
+    else None
 )
 
+instrument_engine(async_engine, "primary")
+if replica_engine is not None:
+    instrument_engine(replica_engine, "replica")
+
 session_maker = async_sessionmaker(bind=async_engine, expire_on_commit=False)
 
+primary_read_session_maker = async_sessionmaker(
+    bind=async_engine.execution_options(isolation_level="AUTOCOMMIT"),
+    expire_on_commit=False,
+)
 
-async def get_session() -> AsyncGenerator[AsyncSession, Any]:
+read_session_maker = (
+    async_sessionmaker(bind=replica_engine, expire_on_commit=False)
+    if replica_engine is not None
+    else primary_read_session_maker
+)
+
+
+async def get_session(
+    request: Request, response: Response
+) -> AsyncGenerator[AsyncSession, Any]:
+    if replica_engine is not None and request.method not in ("GET", "HEAD"):
+        response.set_cookie(
+            READ_PRIMARY_COOKIE, "1", max_age=settings.replica_lag_window
+        )
     session = session_maker()
 
     try:
@@ -34,3 +84,29 @@ async def get_session() -> AsyncGenerator[AsyncSession, Any]:
         raise
     finally:
         await session.close()
+
+
+async def open_read_session(read_primary: bool = False) -> AsyncSession:
+    """Open an autocommit session on the replica, or on the primary as a fallback."""
+    if read_primary or replica_engine is None:
+        return primary_read_session_maker()
+    try:
+        # Checked on a connection of its own, returned to the pool right away,
+        # so the session holds none until its first query
+        async with replica_engine.connect():
+            pass
+    except (OSError, DBAPIError) as error:
+        logger.warning(f"Replica is unavailable, reading from the primary:\n{error}")
+        return primary_read_session_maker()
+    return read_session_maker()
+
+
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession, Any]:
+    read_primary = READ_PRIMARY_COOKIE in request.cookies or (
+        request.headers.get(READ_PRIMARY_HEADER, "").lower() in ("1", "true")
+    )
+    session = await open_read_session(read_primary)
+    try:
+        yield session
+    finally:
+        await session.close()
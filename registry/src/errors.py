@@ -5,6 +5,7 @@ from fastapi import status
 class FastApiError(HTTPException):
 
     def __init__(self, message: str, **kwargs) -> None:
+        self.message = message
         self.detail = {"message": message, **kwargs}
 
 
@@ -22,3 +23,51 @@ class ServerNotFoundError(FastApiError):
 
     def __init__(self, id: int) -> None:
         super().__init__(message=f"Server not found: {id}", id=id)
+
+
+class JobNotFoundError(FastApiError):
+    status_code = status.HTTP_404_NOT_FOUND
+
+    def __init__(self, id: int) -> None:
+        super().__init__(message=f"Registration job not found: {id}", id=id)
+
+
+class ToolRefreshNotFoundError(FastApiError):
+    status_code = status.HTTP_404_NOT_FOUND
+
+    def __init__(self, id: int) -> None:
+        super().__init__(message=f"Server was not refreshed yet: {id}", id=id)
+
+
+class InvalidCursorError(FastApiError):
+    status_code = status.HTTP_400_BAD_REQUEST
+
+    def __init__(self, cursor: str) -> None:
+        super().__init__(message=f"Invalid pagination cursor: {cursor}", cursor=cursor)
+
+
+class QueryTooLongError(FastApiError):
+    status_code = status.HTTP_400_BAD_REQUEST
+
+    def __init__(self, tokens: int, budget: int) -> None:
+        super().__init__(
+            message=f"Query does not fit the search prompt: {tokens} tokens",
+            tokens=tokens,
+            budget=budget,
+        )
+
+
+class NotModifiedError(FastApiError):
+    status_code = status.HTTP_304_NOT_MODIFIED
+
+    def __init__(self, headers: dict[str, str]) -> None:
+        super().__init__(message="Not modified")
+        self.headers = headers
+
+
+class TooManyRequestsError(FastApiError):
+    status_code = status.HTTP_429_TOO_MANY_REQUESTS
+
+    def __init__(self, message: str, retry_after: int) -> None:
+        super().__init__(message=message, retry_after=retry_after)
+        self.headers = {"Retry-After": str(retry_after)}
@@ -0,0 +1,98 @@
+from datetime import timedelta
+
+from fastapi import Depends
+from sqlalchemy import func
+from sqlalchemy import or_
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .schemas import JobStatus
+from registry.src.database import get_session
+from registry.src.database import RegistrationJob
+from registry.src.errors import JobNotFoundError
+from registry.src.servers.schemas import ServerCreate
+from registry.src.settings import settings
+
+
+class JobRepository:
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def create_job(self, data: ServerCreate) -> RegistrationJob:
+        job = RegistrationJob(**data.model_dump(), status=JobStatus.pending)
+        self.session.add(job)
+        await self.session.flush()
+        await self.session.refresh(job)
+        return job
+
+    async def get_job(self, id: int) -> RegistrationJob:
+        job = await self.session.get(RegistrationJob, id)
+        if job is None:
+            raise JobNotFoundError(id)
+        return job
+
+    async def claim_job(self) -> RegistrationJob | None:
+        """Lock the next due job and mark it as running under a lease.
+
+        A running job whose lease has expired was abandoned by a crashed or
+        restarted worker, and is claimed again.
+        """
+        query = (
+            select(RegistrationJob)
+            .where(
+                or_(
+                    RegistrationJob.status == JobStatus.pending,
+                    RegistrationJob.status == JobStatus.running,
+                ),
+                RegistrationJob.run_after <= func.now(),
+            )
+            .order_by(RegistrationJob.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        job = (await self.session.execute(query)).scalars().first()
+        if job is None:
+            return None
+        job.status = JobStatus.running
+        job.attempts += 1
+        job.run_after = func.now() + timedelta(seconds=settings.registration_lease)
+        await self.session.flush()
+        await self.session.refresh(job)
+        return job
+
+    async def hold_job(self, id: int, attempt: int) -> bool:
+        """Lock a running job, unless its lease was lost to a later claim."""
+        query = (
+            select(RegistrationJob.id)
+            .where(
+                RegistrationJob.id == id,
+                RegistrationJob.status == JobStatus.running,
+                RegistrationJob.attempts == attempt,
+            )
+            .with_for_update()
+        )
+        return (await self.session.scalar(query)) is not None
+
+    async def complete_job(self, id: int, server_id: int) -> None:
+        job = await self.get_job(id)
+        job.status = JobStatus.done
+        job.server_id = server_id
+        job.error = None
+        await self.session.flush()
+
+    async def fail_job(self, id: int, error: str, retry_in: float | None) -> None:
+        job = await self.get_job(id)
+        job.error = error
+        if retry_in is None:
+            job.status = JobStatus.failed
+        else:
+            job.status = JobStatus.pending
+            job.run_after = func.now() + timedelta(seconds=retry_in)
+        await self.session.flush()
+
+    @classmethod
+    def get_new_instance(
+        cls, session: AsyncSession = Depends(get_session)
+    ) -> "JobRepository":
+        return cls(session)
@@ -0,0 +1,33 @@
+from fastapi import APIRouter
+from fastapi import BackgroundTasks
+from fastapi import Depends
+from fastapi import status
+
+from .schemas import RegistrationJobRead
+from .service import JobService
+from .worker import registration_workers
+from registry.src.database import RegistrationJob
+from registry.src.servers.schemas import ServerCreate
+
+
+router = APIRouter(prefix="/servers/jobs")
+
+
+@router.post(
+    "", status_code=status.HTTP_202_ACCEPTED, response_model=RegistrationJobRead
+)
+async def create_job(
+    data: ServerCreate,
+    background_tasks: BackgroundTasks,
+    service: JobService = Depends(JobService.get_new_instance),
+) -> RegistrationJob:
+    job = await service.create_job(data)
+    background_tasks.add_task(registration_workers.notify)
+    return job
+
+
+@router.get("/{id}", response_model=RegistrationJobRead)
+async def get_job(
+    id: int, service: JobService = Depends(JobService.get_new_instance)
+) -> RegistrationJob:
+    return await service.get_job(id=id)
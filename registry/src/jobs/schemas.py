@@ -0,0 +1,23 @@
+from datetime import datetime
+from enum import StrEnum
+
+from registry.src.base_schema import BaseSchema
+
+
+class JobStatus(StrEnum):
+    pending = "pending"
+    running = "running"
+    done = "done"
+    failed = "failed"
+
+
+class RegistrationJobRead(BaseSchema):
+    id: int
+    name: str
+    url: str
+    status: JobStatus
+    attempts: int
+    error: str | None
+    server_id: int | None
+    created_at: datetime
+    updated_at: datetime
@@ -0,0 +1,38 @@
+from typing import Self
+
+from fastapi import Depends
+
+from .repository import JobRepository
+from registry.src.database import RegistrationJob
+from registry.src.errors import ServerAlreadyExistsError
+from registry.src.servers.repository import ServerRepository
+from registry.src.servers.schemas import ServerCreate
+from registry.src.servers.schemas import ServerRead
+
+
+class JobService:
+
+    def __init__(self, repo: JobRepository, server_repo: ServerRepository) -> None:
+        self.repo = repo
+        self.server_repo = server_repo
+
+    async def create_job(self, data: ServerCreate) -> RegistrationJob:
+        if servers := await self.server_repo.find_existing_servers(
+            names=[data.name], urls=[data.url]
+        ):
+            dict_servers = [
+                ServerRead.model_validate(server).model_dump() for server in servers
+            ]
+            raise ServerAlreadyExistsError(dict_servers)
+        return await self.repo.create_job(data)
+
+    async def get_job(self, id: int) -> RegistrationJob:
+        return await self.repo.get_job(id)
+
+    @classmethod
+    def get_new_instance(
+        cls,
+        repo: JobRepository = Depends(JobRepository.get_new_instance),
+        server_repo: ServerRepository = Depends(ServerRepository.get_new_instance),
+    ) -> Self:
+        return cls(repo=repo, server_repo=server_repo)
@@ -0,0 +1,112 @@
+import asyncio
+
+from .repository import JobRepository
+from registry.src.database.session import session_maker
+from registry.src.errors import FastApiError
+from registry.src.logger import logger
+from registry.src.search.embeddings import get_embedder
+from registry.src.servers.discovery import discover_server
+from registry.src.servers.repository import ServerRepository
+from registry.src.servers.schemas import ServerCreate
+from registry.src.servers.service import ServerService
+from registry.src.settings import settings
+
+
+class RegistrationWorkers:
+    """Background workers running tool discovery for registration jobs.
+
+    Every database access uses its own short session, so no connection is
+    held while a remote MCP server is being contacted. Jobs are claimed with
+    `FOR UPDATE SKIP LOCKED`, which makes it safe to run workers in several
+    processes. A claim is a lease: results are only saved while the job is
+    still held by the same attempt.
+    """
+
+    def __init__(self) -> None:
+        self.wakeup = asyncio.Event()
+        self.tasks: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        self.tasks = [
+            asyncio.create_task(self._run())
+            for _ in range(settings.registration_workers)
+        ]
+
+    def stop(self) -> None:
+        for task in self.tasks:
+            task.cancel()
+
+    def notify(self) -> None:
+        self.wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                processed = await self._process_next()
+            except Exception as error:
+                logger.error(f"Registration worker failed:\n{error}")
+                processed = False
+            if processed:
+                continue
+            try:
+                await asyncio.wait_for(
+                    self.wakeup.wait(), timeout=settings.registration_poll_interval
+                )
+            except TimeoutError:
+                pass
+            self.wakeup.clear()
+
+    async def _process_next(self) -> bool:
+        async with session_maker() as session, session.begin():
+            job = await JobRepository(session).claim_job()
+            if job is None:
+                return False
+            job_id, attempts = job.id, job.attempts
+            data = ServerCreate.model_validate(job)
+
+        if attempts > settings.registration_max_attempts:
+            # Reclaimed after its last attempt was abandoned mid-discovery
+            await self._fail_job(
+                job_id, attempts, error="Registration was interrupted", retry_in=None
+            )
+            return True
+        try:
+            registration = await discover_server(data, get_embedder())
+            async with session_maker() as session, session.begin():
+                jobs = JobRepository(session)
+                if not await jobs.hold_job(job_id, attempts):
+                    logger.warning(f"Registration job {job_id} lease was lost")
+                    return True
+                service = ServerService(
+                    repo=ServerRepository(session), embedder=get_embedder()
+                )
+                server = await service.register(registration)
+                await jobs.complete_job(job_id, server_id=server.id)
+        except FastApiError as error:
+            await self._fail_job(job_id, attempts, error=error.message, retry_in=None)
+        except Exception as error:
+            retry_in = None
+            if attempts < settings.registration_max_attempts:
+                retry_in = settings.registration_retry_delay * 2 ** (attempts - 1)
+            logger.warning(
+                f"Registration job {job_id} failed ({retry_in=}):\n{error!r}"
+            )
+            await self._fail_job(
+                job_id,
+                attempts,
+                error=f"{type(error).__name__}: {error}",
+                retry_in=retry_in,
+            )
+        return True
+
+    @staticmethod
+    async def _fail_job(
+        job_id: int, attempt: int, error: str, retry_in: float | None
+    ) -> None:
+        async with session_maker() as session, session.begin():
+            jobs = JobRepository(session)
+            if await jobs.hold_job(job_id, attempt):
+                await jobs.fail_job(job_id, error=error, retry_in=retry_in)
+
+
+registration_workers = RegistrationWorkers()
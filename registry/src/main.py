@@ -1,7 +1,39 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 
+from registry.src.jobs.router import router as jobs_router
+from registry.src.jobs.worker import registration_workers
+from registry.src.metrics import metrics
+from registry.src.metrics import MetricsMiddleware
+from registry.src.search.catalogue import search_catalogue
+from registry.src.servers.refresher import tool_refresher
 from registry.src.servers.router import router as servers_router
+from registry.src.tracing import tracer_provider
+from registry.src.tracing import TracingMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    await search_catalogue.load()
+    refresher = asyncio.create_task(search_catalogue.run_refresher())
+    registration_workers.start()
+    tool_refresher.start()
+    yield
+    tool_refresher.stop()
+    registration_workers.stop()
+    refresher.cancel()
+    tracer_provider.shutdown()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
-app = FastAPI()
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
+app.add_route("/metrics", metrics, include_in_schema=False)
 
+app.include_router(jobs_router)
 app.include_router(servers_router)
@@ -0,0 +1,146 @@
+import time
+from typing import Any
+
+from openai.types import CompletionUsage
+from prometheus_client import CONTENT_TYPE_LATEST
+from prometheus_client import Counter
+from prometheus_client import Gauge
+from prometheus_client import generate_latest
+from prometheus_client import Histogram
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.pool import QueuePool
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp
+from starlette.types import Message
+from starlette.types import Receive
+from starlette.types import Scope
+from starlette.types import Send
+
+REQUEST_DURATION = Histogram(
+    "registry_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+)
+DB_QUERY_DURATION = Histogram(
+    "registry_db_query_duration_seconds",
+    "Database statement latency by statement kind",
+    ["engine", "operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "registry_db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled database connection",
+    ["engine"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "registry_db_pool_connections",
+    "Pooled database connections by state",
+    ["engine", "state"],
+)
+LLM_REQUEST_DURATION = Histogram(
+    "registry_llm_request_duration_seconds",
+    "LLM call latency by search operation",
+    ["operation"],
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120),
+)
+LLM_TOKENS = Counter(
+    "registry_llm_tokens_total", "LLM tokens used by search", ["operation", "kind"]
+)
+ADMISSION_REQUESTS = Gauge(
+    "registry_search_admission_requests",
+    "Search requests holding or waiting for an admission slot",
+    ["state"],
+)
+ADMISSION_REJECTED = Counter(
+    "registry_search_admission_rejected_total",
+    "Search requests rejected with 429 by reason",
+    ["reason"],
+)
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection."""
+
+    def _do_get(self) -> Any:
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.labels(self.engine_name).observe(
+                time.perf_counter() - started
+            )
+
+    @property
+    def engine_name(self) -> str:
+        return getattr(self, "_metrics_engine_name", "primary")
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    pool = engine.pool
+    pool._metrics_engine_name = name  # type: ignore[attr-defined]
+    if isinstance(pool, QueuePool):
+        DB_POOL_CONNECTIONS.labels(name, "in_use").set_function(pool.checkedout)
+        DB_POOL_CONNECTIONS.labels(name, "idle").set_function(pool.checkedin)
+        DB_POOL_CONNECTIONS.labels(name, "overflow").set_function(
+            lambda: max(pool.overflow(), 0)
+        )
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        context._metrics_started = time.perf_counter()
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        operation = statement.lstrip().split(None, 1)[0].upper()
+        DB_QUERY_DURATION.labels(name, operation).observe(
+            time.perf_counter() - context._metrics_started
+        )
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+
+
+def observe_llm_request(
+    operation: str, started: float, usage: CompletionUsage | None = None
+) -> None:
+    LLM_REQUEST_DURATION.labels(operation).observe(time.perf_counter() - started)
+    if usage is not None:
+        LLM_TOKENS.labels(operation, "prompt").inc(usage.prompt_tokens)
+        LLM_TOKENS.labels(operation, "completion").inc(usage.completion_tokens)
+
+
+class MetricsMiddleware:
+    """Record the latency of each HTTP request under its route template."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            REQUEST_DURATION.labels(
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                str(status),
+            ).observe(time.perf_counter() - started)
+
+
+async def metrics(request: Request) -> Response:
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
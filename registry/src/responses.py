@@ -0,0 +1,42 @@
+import gzip
+from functools import cache
+from typing import Any
+
+from fastapi import Request
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from registry.src.settings import settings
+
+
+@cache
+def get_type_adapter(schema: Any) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def accepts_gzip(request: Request) -> bool:
+    for coding in request.headers.get("Accept-Encoding", "").split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00")
+    return False
+
+
+def json_response(
+    request: Request, response: Response, content: Any, schema: Any
+) -> Response:
+    """Validate `content` once against `schema` and dump it to JSON in pydantic-core.
+
+    FastAPI's default path validates the endpoint's return value against the
+    response model and then encodes the resulting dicts again. Headers set by
+    dependencies on `response` are copied, since FastAPI does not merge them
+    into responses returned by the endpoint.
+    """
+    adapter = get_type_adapter(schema)
+    body = adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+    headers = dict(response.headers)
+    headers["Vary"] = "Accept-Encoding"
+    if len(body) >= settings.compression_min_size and accepts_gzip(request):
+        body = gzip.compress(body, compresslevel=settings.compression_level)
+        headers["Content-Encoding"] = "gzip"
+    return Response(body, media_type="application/json", headers=headers)
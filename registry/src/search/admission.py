@@ -0,0 +1,184 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterable
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from ipaddress import ip_address
+
+from fastapi import Request
+
+from .schemas import AdmissionStats
+from registry.src.errors import TooManyRequestsError
+from registry.src.logger import logger
+from registry.src.metrics import ADMISSION_REJECTED
+from registry.src.metrics import ADMISSION_REQUESTS
+from registry.src.settings import settings
+
+# Set by trusted proxies to the id of the client they call on behalf of
+CLIENT_ID_HEADER = "X-Client-Id"
+
+
+class RateLimiter:
+    """Per-client token buckets, forgetting the least recently seen clients."""
+
+    def __init__(self, rate: float, burst: int, max_clients: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self.buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def acquire(self, client: str, cost: int = 1) -> float:
+        """Take `cost` tokens, or return the seconds until the client has them."""
+        now = time.monotonic()
+        tokens, updated = self.buckets.pop(client, (float(self.burst), now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        retry_after = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            retry_after = (cost - tokens) / self.rate
+        self.buckets[client] = (tokens, now)
+        if len(self.buckets) > self.max_clients:
+            self.buckets.popitem(last=False)
+        return retry_after
+
+
+class AdmissionController:
+    """Bound concurrent work, queueing a limited number of callers.
+
+    Callers beyond the queue, or those that wait longer than the queue
+    timeout, are rejected straight away so they can retry elsewhere.
+    """
+
+    def __init__(self, limit: int, queue_size: int, queue_timeout: float) -> None:
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.semaphore = asyncio.Semaphore(limit)
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        # Moving average of the admitted work duration, to suggest a retry delay
+        self.average_duration = 1.0
+        ADMISSION_REQUESTS.labels("in_flight").set_function(lambda: self.in_flight)
+        ADMISSION_REQUESTS.labels("waiting").set_function(lambda: self.waiting)
+
+    def _retry_after(self) -> int:
+        return math.ceil(self.average_duration * (self.waiting + 1) / self.limit)
+
+    def _reject(self, reason: str) -> TooManyRequestsError:
+        self.rejected += 1
+        ADMISSION_REJECTED.labels(reason).inc()
+        logger.warning(f"Rejected search request {reason=} {self.waiting=}")
+        return TooManyRequestsError("Search is overloaded", self._retry_after())
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        if not self.semaphore.locked():
+            # Does not suspend, so the slot is taken before the next caller checks
+            await self.semaphore.acquire()
+        elif self.waiting >= self.queue_size:
+            raise self._reject("queue_full")
+        else:
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self.semaphore.acquire(), self.queue_timeout)
+            except TimeoutError:
+                raise self._reject("queue_timeout") from None
+            finally:
+                self.waiting -= 1
+        self.in_flight += 1
+        self.admitted += 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self.semaphore.release()
+            duration = time.perf_counter() - started
+            self.average_duration = 0.9 * self.average_duration + 0.1 * duration
+
+
+search_admission = AdmissionController(
+    limit=settings.search_concurrency,
+    queue_size=settings.search_queue_size,
+    queue_timeout=settings.search_queue_timeout,
+)
+search_rate_limiter = RateLimiter(
+    rate=settings.search_rate_limit,
+    burst=settings.search_rate_burst,
+    max_clients=settings.search_rate_clients,
+)
+
+
+def get_admission_stats() -> AdmissionStats:
+    return AdmissionStats(
+        limit=search_admission.limit,
+        queue_size=search_admission.queue_size,
+        in_flight=search_admission.in_flight,
+        waiting=search_admission.waiting,
+        admitted=search_admission.admitted,
+        rejected=search_admission.rejected,
+        clients=len(search_rate_limiter.buckets),
+    )
+
+
+def get_client(request: Request) -> str:
+    """Rate limit key: the client's address, or the id a trusted proxy forwards.
+
+    The MCP server makes all of its calls from one address, so it forwards
+    the id of the MCP client it is calling on behalf of.
+    """
+    host = request.client.host if request.client else "unknown"
+    forwarded = request.headers.get(CLIENT_ID_HEADER)
+    if forwarded and _is_trusted(host):
+        return f"{host}/{forwarded}"
+    return host
+
+
+def _is_trusted(host: str) -> bool:
+    try:
+        address = ip_address(host)
+    except ValueError:
+        return False
+    return any(
+        address.version == network.version and address in network
+        for network in settings.search_trusted_networks
+    )
+
+
+def check_rate_limit(request: Request, cost: int = 1) -> None:
+    if (retry_after := search_rate_limiter.acquire(get_client(request), cost)) > 0:
+        ADMISSION_REJECTED.labels("rate_limited").inc()
+        raise TooManyRequestsError("Rate limit exceeded", math.ceil(retry_after))
+
+
+async def admit_search(request: Request) -> AsyncIterator[None]:
+    check_rate_limit(request)
+    async with search_admission.admit():
+        yield
+
+
+async def _hold_slot(body: AsyncIterable[str]) -> AsyncIterator[str]:
+    async with search_admission.admit():
+        yield ""
+        async for line in body:
+            yield line
+
+
+async def admit_stream(
+    request: Request, body: AsyncIterable[str]
+) -> AsyncIterator[str]:
+    """Admit a streamed search before its response starts.
+
+    FastAPI exits dependencies before a streaming body is sent, so the slot
+    is held by the body itself until it is fully sent or abandoned.
+    """
+    check_rate_limit(request)
+    stream = _hold_slot(body)
+    # Waits for a slot, so a rejection is still sent as a 429
+    await anext(stream)
+    return stream
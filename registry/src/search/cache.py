@@ -0,0 +1,158 @@
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from functools import cache
+from typing import Protocol
+
+from sqlalchemy import delete
+from sqlalchemy import func
+from sqlalchemy import or_
+from sqlalchemy import select
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert
+
+from .lexical import tokenize
+from .schemas import SearchCacheStats
+from .schemas import SearchMode
+from registry.src.database import SearchCacheEntry
+from registry.src.database.session import session_maker
+from registry.src.settings import settings
+
+# How stale accessed_at may get before a hit updates it
+ACCESS_RESOLUTION = timedelta(minutes=1)
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(tokenize(query))
+
+
+def get_cache_key(query: str, mode: SearchMode, version: int) -> str | None:
+    """Return None for a query without words, which must not share an entry."""
+    normalized = normalize_query(query)
+    if not normalized:
+        return None
+    return f"{version}:{mode}:{normalized}"
+
+
+class SearchCache(Protocol):
+    hits: int
+    misses: int
+
+    async def get(self, key: str) -> list[str] | None: ...  # noqa
+
+    async def set(self, key: str, urls: list[str]) -> None: ...  # noqa
+
+    async def get_stats(self) -> SearchCacheStats: ...  # noqa
+
+
+class MemorySearchCache:
+    def __init__(self, max_size: int, ttl: int) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries: OrderedDict[str, tuple[float, tuple[str, ...]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> list[str] | None:
+        entry = self.entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self.entries.pop(key, None)
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        # A copy, so callers cannot change the cached entry
+        return list(entry[1])
+
+    async def set(self, key: str, urls: list[str]) -> None:
+        self.entries[key] = (time.monotonic() + self.ttl, tuple(urls))
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    async def get_stats(self) -> SearchCacheStats:
+        return SearchCacheStats(
+            backend="memory", size=len(self.entries), hits=self.hits, misses=self.misses
+        )
+
+
+class PostgresSearchCache:
+    """Cache shared by all workers through the `search_cache` table.
+
+    Hit and miss counters are kept per process.
+    """
+
+    def __init__(self, max_size: int, ttl: int) -> None:
+        self.max_size = max_size
+        self.ttl = timedelta(seconds=ttl)
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> list[str] | None:
+        query = select(
+            SearchCacheEntry.urls,
+            (SearchCacheEntry.accessed_at < func.now() - ACCESS_RESOLUTION).label(
+                "stale"
+            ),
+        ).where(
+            SearchCacheEntry.key == key,
+            SearchCacheEntry.created_at > func.now() - self.ttl,
+        )
+        async with session_maker() as session:
+            row = (await session.execute(query)).one_or_none()
+            # Hits only write once per resolution, which is enough for eviction
+            if row is not None and row.stale:
+                touch = (
+                    update(SearchCacheEntry)
+                    .where(
+                        SearchCacheEntry.key == key,
+                        SearchCacheEntry.accessed_at < func.now() - ACCESS_RESOLUTION,
+                    )
+                    .values(accessed_at=func.now())
+                )
+                await session.execute(touch)
+                await session.commit()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row.urls
+
+    async def set(self, key: str, urls: list[str]) -> None:
+        upsert = insert(SearchCacheEntry).values(key=key, urls=urls)
+        upsert = upsert.on_conflict_do_update(
+            index_elements=[SearchCacheEntry.key],
+            set_=dict(urls=urls, created_at=func.now(), accessed_at=func.now()),
+        )
+        least_recent = (
+            select(SearchCacheEntry.key)
+            .order_by(SearchCacheEntry.accessed_at.desc())
+            .offset(self.max_size)
+        )
+        evict = delete(SearchCacheEntry).where(
+            or_(
+                SearchCacheEntry.key.in_(least_recent),
+                SearchCacheEntry.created_at <= func.now() - self.ttl,
+            )
+        )
+        async with session_maker() as session, session.begin():
+            await session.execute(upsert)
+            await session.execute(evict)
+
+    async def get_stats(self) -> SearchCacheStats:
+        async with session_maker() as session:
+            size = await session.scalar(select(func.count(SearchCacheEntry.key)))
+        return SearchCacheStats(
+            backend="postgres", size=size or 0, hits=self.hits, misses=self.misses
+        )
+
+
+@cache
+def get_search_cache() -> SearchCache:
+    if settings.search_cache_backend == "postgres":
+        return PostgresSearchCache(
+            max_size=settings.search_cache_size, ttl=settings.search_cache_ttl
+        )
+    return MemorySearchCache(
+        max_size=settings.search_cache_size, ttl=settings.search_cache_ttl
+    )
@@ -0,0 +1,160 @@
+import asyncio
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Self
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .lexical import lexical_index
+from .prompt_builder import make_row
+from .schemas import PromptRow
+from .schemas import SearchServer
+from .vector import vector_index
+from registry.src.database import Server
+from registry.src.database.session import open_read_session
+from registry.src.logger import logger
+from registry.src.servers.repository import ServerRepository
+from registry.src.settings import settings
+
+
+class CatalogueSnapshot:
+    """Immutable view of the catalogue used by the search hot path.
+
+    Holds the validated `SearchServer`s and their pre-rendered, pre-counted
+    prompt rows, so a search does not touch the database before the LLM call.
+    """
+
+    def __init__(
+        self,
+        version: int,
+        servers: Mapping[int, SearchServer],
+        rows: Mapping[int, PromptRow],
+    ) -> None:
+        self.version = version
+        self.servers_by_id: Mapping[int, SearchServer] = MappingProxyType(dict(servers))
+        self.rows: Mapping[int, PromptRow] = MappingProxyType(dict(rows))
+        self.servers: tuple[SearchServer, ...] = tuple(self.servers_by_id.values())
+
+    @classmethod
+    def build(cls, version: int, servers: list[Server]) -> Self:
+        search_servers = [SearchServer.model_validate(server) for server in servers]
+        return cls(
+            version=version,
+            servers={server.id: server for server in search_servers},
+            rows={server.id: make_row(server) for server in search_servers},
+        )
+
+    def with_changes(
+        self, version: int, servers: list[SearchServer], removed_ids: list[int]
+    ) -> Self:
+        servers_by_id = dict(self.servers_by_id)
+        rows = dict(self.rows)
+        for id in removed_ids:
+            servers_by_id.pop(id, None)
+            rows.pop(id, None)
+        for server in servers:
+            servers_by_id[server.id] = server
+            rows[server.id] = make_row(server)
+        return type(self)(version=version, servers=servers_by_id, rows=rows)
+
+
+class SearchCatalogue:
+    """Process-wide holder of the current snapshot and the search indexes.
+
+    Only the servers written or deleted since the snapshot's version are
+    reloaded. Writes made by this process are picked up right after they
+    commit, writes made by other workers by polling the catalogue version.
+    """
+
+    def __init__(self) -> None:
+        self.snapshot = CatalogueSnapshot(version=-1, servers={}, rows={})
+        self.loaded = False
+        self.lock = asyncio.Lock()
+        self.tasks: set[asyncio.Task[None]] = set()
+
+    async def load(self) -> None:
+        async with self.lock:
+            async with await open_read_session() as session:
+                repo = ServerRepository(session)
+                version = await repo.get_catalogue_version()
+                servers = await repo.get_search_servers()
+                embeddings = await repo.get_embeddings()
+            lexical_index.rebuild(servers)
+            vector_index.rebuild(embeddings)
+            self.snapshot = CatalogueSnapshot.build(version=version, servers=servers)
+            self.loaded = True
+        logger.info(f"Loaded catalogue {version=} with {len(servers)} servers")
+
+    async def get_snapshot(self) -> CatalogueSnapshot:
+        if not self.loaded:
+            await self.load()
+        return self.snapshot
+
+    def _apply(
+        self,
+        version: int,
+        servers: list[Server],
+        removed_ids: list[int],
+        embeddings: dict[int, list[list[float]]],
+    ) -> None:
+        for id in removed_ids:
+            lexical_index.remove(id)
+            vector_index.remove(id)
+        for server in servers:
+            lexical_index.add(server)
+            vector_index.add(server.id, embeddings.get(server.id, []))
+        self.snapshot = self.snapshot.with_changes(
+            version,
+            servers=[SearchServer.model_validate(server) for server in servers],
+            removed_ids=removed_ids,
+        )
+
+    async def refresh(self, read_primary: bool = False) -> None:
+        if not self.loaded:
+            await self.load()
+            return
+        async with self.lock, await open_read_session(read_primary) as session:
+            repo = ServerRepository(session)
+            version = await repo.get_catalogue_version()
+            since = self.snapshot.version
+            # A lagging replica may still be behind the snapshot
+            if version <= since:
+                return
+            # Tombstones are read first, so a server deleted in between is
+            # either missing from the changes or removed on the next refresh
+            removed_ids = await repo.get_deleted_server_ids(since)
+            servers = await repo.get_search_servers(since)
+            embeddings = await repo.get_embeddings(since)
+            self._apply(version, servers, removed_ids, embeddings)
+        logger.info(
+            f"Refreshed catalogue {version=} with {len(servers)} changed "
+            f"and {len(removed_ids)} deleted servers"
+        )
+
+    async def _refresh_committed(self) -> None:
+        try:
+            await self.refresh(read_primary=True)
+        except Exception as error:
+            logger.error(f"Failed to refresh the catalogue snapshot:\n{error}")
+
+    def refresh_after_commit(self, session: AsyncSession) -> None:
+        """Pick up the session's writes once committed; a rollback leaves no trace."""
+
+        def schedule(_) -> None:
+            task = asyncio.get_running_loop().create_task(self._refresh_committed())
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+        event.listen(session.sync_session, "after_commit", schedule, once=True)
+
+    async def run_refresher(self) -> None:
+        while True:
+            await asyncio.sleep(settings.catalogue_refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as error:
+                logger.error(f"Failed to refresh the catalogue snapshot:\n{error}")
+
+
+search_catalogue = SearchCatalogue()
@@ -0,0 +1,79 @@
+import hashlib
+import math
+from functools import cache
+from typing import Protocol
+
+from httpx import AsyncClient
+from openai import AsyncOpenAI
+
+from .lexical import tokenize
+from .schemas import ServerEmbeddings
+from registry.src.servers.schemas import Tool
+from registry.src.settings import settings
+
+
+class Embedder(Protocol):
+    async def embed(self, texts: list[str]) -> list[list[float]]: ...  # noqa
+
+
+class OpenAIEmbedder:
+    def __init__(self) -> None:
+        http_client: AsyncClient = (
+            AsyncClient()
+            if settings.llm_proxy is None
+            else AsyncClient(proxy=settings.llm_proxy)
+        )
+        self.client = AsyncOpenAI(http_client=http_client)
+
+    async def embed(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        response = await self.client.embeddings.create(
+            model=settings.embedding_model,
+            input=texts,
+            dimensions=settings.embedding_dimensions,
+        )
+        return [item.embedding for item in response.data]
+
+
+class HashingEmbedder:
+    """Deterministic local embedder based on signed feature hashing of tokens."""
+
+    def __init__(self, dimensions: int | None = None) -> None:
+        self.dimensions = dimensions or settings.embedding_dimensions
+
+    def _embed_one(self, text: str) -> list[float]:
+        vector = [0.0] * self.dimensions
+        for token in tokenize(text):
+            digest = hashlib.blake2b(token.encode(), digest_size=8).digest()
+            value = int.from_bytes(digest, "big")
+            sign = 1.0 if value & 1 else -1.0
+            vector[(value >> 1) % self.dimensions] += sign
+        norm = math.sqrt(sum(component * component for component in vector))
+        return [component / norm for component in vector] if norm else vector
+
+    async def embed(self, texts: list[str]) -> list[list[float]]:
+        return [self._embed_one(text) for text in texts]
+
+
+def describe(name: str, description: str) -> str:
+    return f"{name}: {description}"
+
+
+async def embed_server(
+    embedder: Embedder, name: str, description: str, tools: list[Tool]
+) -> ServerEmbeddings:
+    texts = [describe(name, description)]
+    texts += [describe(tool.name, tool.description) for tool in tools]
+    server_embedding, *tool_embeddings = await embedder.embed(texts)
+    return ServerEmbeddings(
+        server=server_embedding,
+        tools={tool.name: embedding for tool, embedding in zip(tools, tool_embeddings)},
+    )
+
+
+@cache
+def get_embedder() -> Embedder:
+    if settings.embedding_backend == "hashing":
+        return HashingEmbedder()
+    return OpenAIEmbedder()
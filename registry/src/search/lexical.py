@@ -0,0 +1,82 @@
+import math
+import re
+import unicodedata
+from collections import Counter
+from collections import defaultdict
+
+from registry.src.database import Server
+
+# Letters and digits of any script; underscores split snake_case tool names
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_PATTERN.findall(unicodedata.normalize("NFKC", text).casefold())
+
+
+def server_tokens(server: Server) -> list[str]:
+    tokens = tokenize(server.name) + tokenize(server.description)
+    for tool in server.tools:
+        tokens += tokenize(tool.name) + tokenize(tool.description)
+    return tokens
+
+
+class LexicalIndex:
+    """In-process BM25 index over server names, descriptions and tools."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self.postings: defaultdict[str, dict[int, int]] = defaultdict(dict)
+        self.term_frequencies: dict[int, Counter[str]] = {}
+        self.total_length = 0
+
+    def add(self, server: Server) -> None:
+        self.remove(server.id)
+        frequencies = Counter(server_tokens(server))
+        for term, frequency in frequencies.items():
+            self.postings[term][server.id] = frequency
+        self.term_frequencies[server.id] = frequencies
+        self.total_length += frequencies.total()
+
+    def remove(self, server_id: int) -> None:
+        frequencies = self.term_frequencies.pop(server_id, None)
+        if frequencies is None:
+            return
+        for term in frequencies:
+            postings = self.postings[term]
+            postings.pop(server_id, None)
+            if not postings:
+                del self.postings[term]
+        self.total_length -= frequencies.total()
+
+    def rebuild(self, servers: list[Server]) -> None:
+        self.postings.clear()
+        self.term_frequencies.clear()
+        self.total_length = 0
+        for server in servers:
+            self.add(server)
+
+    def scores(self, query: str) -> dict[int, float]:
+        documents_count = len(self.term_frequencies)
+        if not documents_count:
+            return {}
+        average_length = self.total_length / documents_count
+        scores: defaultdict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(
+                1 + (documents_count - len(postings) + 0.5) / (len(postings) + 0.5)
+            )
+            for server_id, frequency in postings.items():
+                length = self.term_frequencies[server_id].total()
+                norm = self.k1 * (1 - self.b + self.b * length / average_length)
+                scores[server_id] += (
+                    idf * frequency * (self.k1 + 1) / (frequency + norm)
+                )
+        return dict(scores)
+
+
+lexical_index = LexicalIndex()
@@ -0,0 +1,130 @@
+from collections.abc import Mapping
+from functools import cache
+
+import tiktoken
+
+from .prompts import get_top_servers
+from .schemas import PromptRow
+from .schemas import SearchPrompt
+from .schemas import SearchServer
+from registry.src.errors import QueryTooLongError
+from registry.src.logger import logger
+from registry.src.settings import settings
+
+DEFAULT_ENCODING = "o200k_base"
+# Tokens taken by the `s123 | ` local id column of a row
+ID_TOKENS = 4
+
+
+@cache
+def get_encoding() -> tiktoken.Encoding | None:
+    try:
+        encoding_name = tiktoken.encoding_name_for_model(settings.llm_model)
+    except KeyError:
+        encoding_name = DEFAULT_ENCODING
+    try:
+        return tiktoken.get_encoding(encoding_name)
+    except Exception as error:
+        logger.warning(f"Tokenizer {encoding_name} is unavailable:\n{error}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encoding = get_encoding()
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    encoding = get_encoding()
+    if encoding is None:
+        return text[: max_tokens * 4]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+
+def clean(text: str) -> str:
+    return " ".join(text.replace("|", "/").split())
+
+
+def make_row(server: SearchServer) -> PromptRow:
+    description = clean(server.description)
+    text = f"{clean(server.name)} | {description}"
+    return PromptRow(
+        text=text,
+        tokens=count_tokens(text) + ID_TOKENS,
+        description_tokens=count_tokens(description),
+    )
+
+
+def fit_budget(rows: list[PromptRow], budget: int) -> tuple[int, int | None]:
+    """Return how many rows fit and the per-description token cap, if any.
+
+    Rows are kept in order until even their description-less part does not
+    fit; the remaining budget is then shared by capping the longest
+    descriptions at the same length.
+    """
+    fitting_count = 0
+    fixed_tokens = 0
+    for row in rows:
+        row_fixed_tokens = row.tokens - row.description_tokens
+        if fixed_tokens + row_fixed_tokens > budget:
+            break
+        fixed_tokens += row_fixed_tokens
+        fitting_count += 1
+    available = budget - fixed_tokens
+    description_tokens = [row.description_tokens for row in rows[:fitting_count]]
+    if not description_tokens or sum(description_tokens) <= available:
+        return fitting_count, None
+    low, high = 0, max(description_tokens)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if sum(min(tokens, middle) for tokens in description_tokens) <= available:
+            low = middle
+        else:
+            high = middle - 1
+    return fitting_count, low
+
+
+def get_rows_budget(query: str) -> int:
+    """Return the prompt tokens left for server rows once the template and query are in."""
+    query_tokens = count_tokens(query)
+    budget = (
+        settings.search_prompt_tokens - count_tokens(get_top_servers) - query_tokens
+    )
+    if budget <= 0:
+        raise QueryTooLongError(query_tokens, settings.search_prompt_tokens)
+    return budget
+
+
+def build_search_prompt(
+    rows: Mapping[int, PromptRow], servers: list[SearchServer], query: str
+) -> SearchPrompt:
+    budget = get_rows_budget(query)
+    server_rows = [rows[server.id] for server in servers]
+    fitting_count, description_cap = fit_budget(server_rows, budget)
+    if fitting_count < len(servers):
+        logger.warning(
+            f"Dropped {len(servers) - fitting_count} servers over the prompt budget"
+        )
+
+    lines = []
+    urls = {}
+    for position, (server, row) in enumerate(
+        zip(servers[:fitting_count], server_rows), start=1
+    ):
+        local_id = f"s{position}"
+        urls[local_id] = server.url
+        text = row.text
+        if description_cap is not None and row.description_tokens > description_cap:
+            description = truncate_tokens(clean(server.description), description_cap)
+            text = f"{clean(server.name)} | {description}…"
+        lines.append(f"{local_id} | {text}")
+
+    text = get_top_servers.format(servers_table="\n".join(lines), request=query)
+    tokens = count_tokens(text)
+    logger.info(
+        f"Search prompt uses {tokens} tokens for {len(lines)} servers "
+        f"({description_cap=})"
+    )
+    return SearchPrompt(text=text, urls=urls, tokens=tokens)
@@ -4,10 +4,15 @@ You are part of MCP search engine. You are given a list of MCP server descriptio
 
 Consider if it is possible to satisfy the request in one step or in several steps. Consider if some tools don't have enough data if they are enough to completely perform one step or if you need to select several alternatives for the step. It is important that you follow the output format precisely.
 
+MCP servers are given as a table with one server per line. Refer to servers by their `id` from this table. Long descriptions may be truncated with `…`.
+
 Input data for you:
 
 ```
-mcp_servers = {servers_list!r}
+mcp_servers:
+id | name | description
+{servers_table}
+
 user_request = {request!r}
 ```
 """.strip()
@@ -1,6 +1,15 @@
+from enum import StrEnum
+
 from pydantic import Field
 
 from registry.src.base_schema import BaseSchema
+from registry.src.settings import settings
+
+
+class SearchMode(StrEnum):
+    llm = "llm"
+    vector = "vector"
+    sharded = "sharded"
 
 
 class SearchServerURL(BaseSchema):
@@ -13,6 +22,12 @@ class SearchServer(SearchServerURL):
     description: str
 
 
+class SearchServerRef(BaseSchema):
+    id: str = Field(
+        ..., description="`id` of the server, copy this from `mcp_servers` table"
+    )
+
+
 class SolutionStep(BaseSchema):
     step_description: str
     best_server_description: str = Field(
@@ -23,14 +38,14 @@ class SolutionStep(BaseSchema):
         ...,
         description="Name of the best server for this step, copy this from `mcp_servers` entry",
     )
-    best_server: SearchServerURL = Field(
+    best_server: SearchServerRef = Field(
         ..., description="The best server for this step"
     )
     confidence: str = Field(
         ...,
         description="How confident you are that this server is enough for this step?",
     )
-    additional_servers: list[SearchServerURL] = Field(
+    additional_servers: list[SearchServerRef] = Field(
         ...,
         description="Alternative servers if you think the `best_server` may not be enough",
     )
@@ -40,3 +55,66 @@ class SearchResponse(BaseSchema):
     solution_steps: list[SolutionStep] = Field(
         ..., description="List of solution steps and servers for each step"
     )
+
+
+class ServerEmbeddings(BaseSchema):
+    server: list[float]
+    tools: dict[str, list[float]]
+
+
+class ServerSelection(BaseSchema):
+    step_description: str
+    best_server_url: str | None
+    additional_server_urls: list[str]
+
+
+class PromptRow(BaseSchema):
+    text: str
+    tokens: int
+    description_tokens: int
+
+
+class SearchPrompt(BaseSchema):
+    text: str
+    urls: dict[str, str]
+    tokens: int
+
+
+class SearchBatch(BaseSchema):
+    queries: list[str] = Field(..., min_length=1, max_length=settings.search_batch_size)
+    mode: SearchMode = SearchMode.llm
+
+
+class BatchSearchResult(BaseSchema):
+    queries: list[str]
+    server_urls: list[str] = []
+    error: str | None = None
+
+
+class SearchCacheStats(BaseSchema):
+    backend: str
+    size: int
+    hits: int
+    misses: int
+
+
+class SingleFlightStats(BaseSchema):
+    started: int
+    coalesced: int
+    in_flight: int
+
+
+class AdmissionStats(BaseSchema):
+    limit: int
+    queue_size: int
+    in_flight: int
+    waiting: int
+    admitted: int
+    rejected: int
+    clients: int
+
+
+class SearchStats(BaseSchema):
+    cache: SearchCacheStats
+    single_flight: SingleFlightStats
+    admission: AdmissionStats
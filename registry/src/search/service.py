@@ -1,56 +1,358 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from functools import cache
 from typing import Self
 
 import instructor
+from fastapi import Depends
 from httpx import AsyncClient
 from openai import AsyncOpenAI
+from openai.types.chat import ChatCompletionMessageParam
 
-from .prompts import get_top_servers
+from .admission import get_admission_stats
+from .admission import search_admission
+from .cache import get_cache_key
+from .cache import get_search_cache
+from .cache import normalize_query
+from .cache import SearchCache
+from .catalogue import CatalogueSnapshot
+from .embeddings import Embedder
+from .embeddings import get_embedder
+from .lexical import lexical_index
+from .prompt_builder import build_search_prompt
+from .prompt_builder import get_rows_budget
+from .schemas import BatchSearchResult
+from .schemas import SearchMode
+from .schemas import SearchPrompt
 from .schemas import SearchResponse
 from .schemas import SearchServer
+from .schemas import SearchServerRef
+from .schemas import SearchStats
+from .schemas import ServerSelection
+from .schemas import SolutionStep
+from .single_flight import search_flight
+from .vector import vector_index
 from registry.src.logger import logger
+from registry.src.metrics import observe_llm_request
 from registry.src.settings import settings
+from registry.src.tracing import tracer
+
+
+@cache
+def get_llm() -> instructor.AsyncInstructor:
+    http_client: AsyncClient = (
+        AsyncClient()
+        if settings.llm_proxy is None
+        else AsyncClient(proxy=settings.llm_proxy)
+    )
+    return instructor.from_openai(AsyncOpenAI(http_client=http_client))
+
+
+def group_queries(queries: list[str]) -> list[list[str]]:
+    """Group the queries of a batch that share a search, in order of appearance."""
+    groups: dict[str, list[str]] = {}
+    for query in queries:
+        # Queries without words are only grouped with identical ones
+        key = normalize_query(query) or query
+        groups.setdefault(key, []).append(query)
+    return list(groups.values())
 
 
 class SearchService:
-    def __init__(self) -> None:
-        http_client: AsyncClient = (
-            AsyncClient()
-            if settings.llm_proxy is None
-            else AsyncClient(proxy=settings.llm_proxy)
-        )
-        self.llm = instructor.from_openai(AsyncOpenAI(http_client=http_client))
+    def __init__(
+        self, embedder: Embedder, cache: SearchCache, llm: instructor.AsyncInstructor
+    ) -> None:
+        self.embedder = embedder
+        self.cache = cache
+        self.llm = llm
 
-    async def _get_search_response(
-        self, servers: list[SearchServer], query: str
-    ) -> SearchResponse:
-        prompt = get_top_servers.format(servers_list=servers, request=query)
-        completion = await self.llm.chat.completions.create(
-            model=settings.llm_model,
-            messages=[
-                {
-                    "role": "user",
-                    "content": prompt,
-                },
-            ],
-            response_model=SearchResponse,
-        )
-        logger.debug(f"{completion=}")
-        return completion
+    @staticmethod
+    def _get_messages(prompt: SearchPrompt) -> list[ChatCompletionMessageParam]:
+        return [
+            {
+                "role": "user",
+                "content": prompt.text,
+            },
+        ]
 
     @staticmethod
-    def _collect_urls(search_response: SearchResponse) -> list[str]:
-        server_urls = set()
-        for solution_step in search_response.solution_steps:
-            server_urls.add(solution_step.best_server.url)
-            server_urls |= {server.url for server in solution_step.additional_servers}
+    def _resolve_url(server: SearchServerRef, prompt: SearchPrompt) -> str | None:
+        url = prompt.urls.get(server.id.strip())
+        if url is None:
+            logger.warning(f"Unknown server id in search response {server.id=}")
+        return url
+
+    def _resolve_step(
+        self, solution_step: SolutionStep, prompt: SearchPrompt
+    ) -> ServerSelection:
+        additional_urls = [
+            self._resolve_url(server, prompt)
+            for server in solution_step.additional_servers
+        ]
+        return ServerSelection(
+            step_description=solution_step.step_description,
+            best_server_url=self._resolve_url(solution_step.best_server, prompt),
+            additional_server_urls=[url for url in additional_urls if url],
+        )
+
+    async def _select(
+        self, snapshot: CatalogueSnapshot, servers: list[SearchServer], query: str
+    ) -> list[str]:
+        prompt = build_search_prompt(snapshot.rows, servers=servers, query=query)
+        started = time.perf_counter()
+        with tracer.start_as_current_span(
+            "llm.select",
+            attributes={
+                "llm.model": settings.llm_model,
+                "search.servers": len(servers),
+            },
+        ) as span:
+            completion, raw_completion = (
+                await self.llm.chat.completions.create_with_completion(
+                    model=settings.llm_model,
+                    messages=self._get_messages(prompt),
+                    response_model=SearchResponse,
+                )
+            )
+            if raw_completion.usage is not None:
+                span.set_attribute(
+                    "llm.prompt_tokens", raw_completion.usage.prompt_tokens
+                )
+                span.set_attribute(
+                    "llm.completion_tokens", raw_completion.usage.completion_tokens
+                )
+        observe_llm_request("select", started, raw_completion.usage)
+        logger.debug(f"{completion=}")
+        server_urls: set[str] = set()
+        for solution_step in completion.solution_steps:
+            selection = self._resolve_step(solution_step, prompt)
+            if selection.best_server_url:
+                server_urls.add(selection.best_server_url)
+            server_urls |= set(selection.additional_server_urls)
         return list(server_urls)
 
+    @tracer.start_as_current_span("search.rank")
+    async def _rank(self, query: str) -> dict[int, float]:
+        keyword_scores = lexical_index.scores(query)
+        vector_scores: dict[int, float] = {}
+        if vector_index.vectors:
+            [query_vector] = await self.embedder.embed([query])
+            vector_scores = vector_index.scores(query_vector)
+        keyword_weight = settings.search_keyword_weight
+        top_keyword_score = max(keyword_scores.values(), default=0.0) or 1.0
+        scores = {
+            id: (1 - keyword_weight) * score for id, score in vector_scores.items()
+        }
+        for id, score in keyword_scores.items():
+            scores[id] = (
+                scores.get(id, 0.0) + keyword_weight * score / top_keyword_score
+            )
+        return scores
+
+    async def _shortlist(
+        self, servers: tuple[SearchServer, ...], query: str
+    ) -> list[SearchServer]:
+        limit = settings.search_shortlist_size
+        if len(servers) <= limit:
+            return list(servers)
+        scores = await self._rank(query)
+        ranked = sorted(servers, key=lambda server: -scores.get(server.id, 0.0))
+        logger.info(f"Shortlisted {limit} of {len(servers)} servers")
+        return ranked[:limit]
+
     async def get_fitting_servers(
-        self, servers: list[SearchServer], query: str
+        self, snapshot: CatalogueSnapshot, query: str
+    ) -> list[str]:
+        candidates = await self._shortlist(servers=snapshot.servers, query=query)
+        return await self._select(snapshot=snapshot, servers=candidates, query=query)
+
+    @staticmethod
+    def _shard(
+        snapshot: CatalogueSnapshot, servers: list[SearchServer], query: str
+    ) -> list[list[SearchServer]]:
+        # A full shard must still fit the prompt next to the template and query
+        limit = min(settings.search_shard_tokens, get_rows_budget(query))
+        shards: list[list[SearchServer]] = [[]]
+        shard_tokens = 0
+        for server in servers:
+            server_tokens = snapshot.rows[server.id].tokens
+            if shards[-1] and shard_tokens + server_tokens > limit:
+                shards.append([])
+                shard_tokens = 0
+            shards[-1].append(server)
+            shard_tokens += server_tokens
+        return shards
+
+    async def _select_from_shards(
+        self, snapshot: CatalogueSnapshot, servers: list[SearchServer], query: str
+    ) -> list[str]:
+        shards = self._shard(snapshot, servers, query)
+        if len(shards) == 1:
+            return await self._select(snapshot=snapshot, servers=servers, query=query)
+
+        semaphore = asyncio.Semaphore(settings.search_shard_concurrency)
+
+        async def select(shard: list[SearchServer]) -> list[str]:
+            async with semaphore:
+                return await self._select(snapshot=snapshot, servers=shard, query=query)
+
+        responses = await asyncio.gather(
+            *(select(shard) for shard in shards), return_exceptions=True
+        )
+        errors = [error for error in responses if isinstance(error, BaseException)]
+        if len(errors) == len(responses):
+            raise errors[0]
+        for error in errors:
+            logger.error(f"Shard selection failed:\n{error}")
+        winner_urls = {
+            url
+            for response in responses
+            if not isinstance(response, BaseException)
+            for url in response
+        }
+        winners = [server for server in servers if server.url in winner_urls]
+        logger.info(
+            f"Selected {len(winners)} of {len(servers)} servers "
+            f"from {len(shards)} shards"
+        )
+        if not winners:
+            return []
+        if len(winners) >= len(servers):
+            return await self._select(snapshot=snapshot, servers=winners, query=query)
+        return await self._select_from_shards(snapshot, winners, query)
+
+    async def get_sharded_servers(
+        self, snapshot: CatalogueSnapshot, query: str
+    ) -> list[str]:
+        return await self._select_from_shards(snapshot, list(snapshot.servers), query)
+
+    async def stream_solution_steps(
+        self, snapshot: CatalogueSnapshot, query: str
+    ) -> AsyncIterator[ServerSelection]:
+        candidates = await self._shortlist(servers=snapshot.servers, query=query)
+        prompt = build_search_prompt(snapshot.rows, servers=candidates, query=query)
+        started = time.perf_counter()
+        # Not made current: the generator is resumed from the response's context
+        span = tracer.start_span(
+            "llm.stream",
+            attributes={
+                "llm.model": settings.llm_model,
+                "search.servers": len(candidates),
+            },
+        )
+        solution_steps = self.llm.chat.completions.create_iterable(
+            model=settings.llm_model,
+            messages=self._get_messages(prompt),
+            response_model=SolutionStep,
+        )
+        server_urls: set[str] = set()
+        try:
+            async for solution_step in solution_steps:
+                logger.debug(f"{solution_step=}")
+                selection = self._resolve_step(solution_step, prompt)
+                if selection.best_server_url:
+                    server_urls.add(selection.best_server_url)
+                server_urls |= set(selection.additional_server_urls)
+                yield selection
+        finally:
+            span.end()
+        observe_llm_request("stream", started)
+        key = get_cache_key(query, SearchMode.llm, snapshot.version)
+        if key is not None:
+            await self.cache.set(key, list(server_urls))
+
+    async def get_similar_servers(
+        self, snapshot: CatalogueSnapshot, query: str
     ) -> list[str]:
-        search_response = await self._get_search_response(servers=servers, query=query)
-        return self._collect_urls(search_response=search_response)
+        scores = await self._rank(query)
+        ranked = sorted(
+            (server for server in snapshot.servers if server.id in scores),
+            key=lambda server: -scores[server.id],
+        )
+        return [server.url for server in ranked[: settings.search_vector_limit]]
+
+    async def _search(
+        self,
+        snapshot: CatalogueSnapshot,
+        query: str,
+        mode: SearchMode,
+        key: str | None,
+    ) -> list[str]:
+        if mode == SearchMode.vector:
+            server_urls = await self.get_similar_servers(snapshot=snapshot, query=query)
+        elif mode == SearchMode.sharded:
+            server_urls = await self.get_sharded_servers(snapshot=snapshot, query=query)
+        else:
+            server_urls = await self.get_fitting_servers(snapshot=snapshot, query=query)
+        if key is not None:
+            await self.cache.set(key, server_urls)
+        return server_urls
+
+    async def get_server_urls(
+        self, snapshot: CatalogueSnapshot, query: str, mode: SearchMode
+    ) -> list[str]:
+        key = get_cache_key(query, mode, snapshot.version)
+        with tracer.start_as_current_span(
+            "search", attributes={"search.mode": mode.value}
+        ) as span:
+            if key is None:
+                span.set_attribute("search.cache_hit", False)
+                return await self._search(
+                    snapshot=snapshot, query=query, mode=mode, key=None
+                )
+            server_urls = await self.cache.get(key)
+            span.set_attribute("search.cache_hit", server_urls is not None)
+            if server_urls is not None:
+                return server_urls
+            return await search_flight.run(
+                key,
+                lambda: self._search(
+                    snapshot=snapshot, query=query, mode=mode, key=key
+                ),
+            )
+
+    async def search_batch(
+        self, snapshot: CatalogueSnapshot, groups: list[list[str]], mode: SearchMode
+    ) -> AsyncIterator[BatchSearchResult]:
+        """Yield results in completion order, searching each group of queries once.
+
+        Every search takes its own admission slot, like a single search does.
+        """
+        semaphore = asyncio.Semaphore(settings.search_batch_concurrency)
+
+        async def search(queries: list[str]) -> BatchSearchResult:
+            async with semaphore:
+                try:
+                    async with search_admission.admit():
+                        server_urls = await self.get_server_urls(
+                            snapshot=snapshot, query=queries[0], mode=mode
+                        )
+                except Exception as error:
+                    logger.error(f"Batch search failed for {queries[0]=}:\n{error}")
+                    return BatchSearchResult(queries=queries, error=str(error))
+                return BatchSearchResult(queries=queries, server_urls=server_urls)
+
+        tasks = [asyncio.create_task(search(queries)) for queries in groups]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def get_stats(self) -> SearchStats:
+        return SearchStats(
+            cache=await self.cache.get_stats(),
+            single_flight=search_flight.get_stats(),
+            admission=get_admission_stats(),
+        )
 
     @classmethod
-    async def get_new_instance(cls) -> Self:
-        return cls()
+    async def get_new_instance(
+        cls,
+        embedder: Embedder = Depends(get_embedder),
+        cache: SearchCache = Depends(get_search_cache),
+        llm: instructor.AsyncInstructor = Depends(get_llm),
+    ) -> Self:
+        return cls(embedder=embedder, cache=cache, llm=llm)
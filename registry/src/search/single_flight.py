@@ -0,0 +1,49 @@
+import asyncio
+from collections.abc import Callable
+from collections.abc import Coroutine
+from typing import Any
+from typing import Generic
+from typing import TypeVar
+
+from .schemas import SingleFlightStats
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """Coalesce concurrent calls with the same key into one shared task.
+
+    Waiters are shielded from the shared task, so a cancelled caller (e.g. a
+    disconnected client) does not cancel the work for the remaining ones.
+    """
+
+    def __init__(self) -> None:
+        self.calls: dict[str, asyncio.Task[T]] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def _forget(self, key: str, task: asyncio.Task[T]) -> None:
+        if self.calls.get(key) is task:
+            del self.calls[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved when every waiter has gone away
+            task.exception()
+
+    async def run(self, key: str, func: Callable[[], Coroutine[Any, Any, T]]) -> T:
+        task = self.calls.get(key)
+        if task is None:
+            task = asyncio.create_task(func())
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.calls[key] = task
+            self.started += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def get_stats(self) -> SingleFlightStats:
+        return SingleFlightStats(
+            started=self.started, coalesced=self.coalesced, in_flight=len(self.calls)
+        )
+
+
+search_flight: SingleFlight[list[str]] = SingleFlight()
@@ -0,0 +1,64 @@
+import numpy as np
+
+
+class VectorIndex:
+    """In-process cosine index over server and tool embeddings.
+
+    Every server owns one row for its own embedding plus one row per tool;
+    a server scores as its best matching row.
+    """
+
+    def __init__(self) -> None:
+        self.vectors: dict[int, np.ndarray] = {}
+        self._matrix: np.ndarray | None = None
+        self._owners: np.ndarray | None = None
+        self._owner_ids: list[int] = []
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def add(self, server_id: int, vectors: list[list[float]]) -> None:
+        if not vectors:
+            self.remove(server_id)
+            return
+        self.vectors[server_id] = self._normalize(np.asarray(vectors, dtype=np.float32))
+        self._matrix = None
+
+    def remove(self, server_id: int) -> None:
+        if self.vectors.pop(server_id, None) is not None:
+            self._matrix = None
+
+    def rebuild(self, vectors: dict[int, list[list[float]]]) -> None:
+        self.vectors.clear()
+        self._matrix = None
+        for server_id, server_vectors in vectors.items():
+            self.add(server_id, server_vectors)
+
+    def _stack(self) -> tuple[np.ndarray, np.ndarray]:
+        if self._matrix is not None and self._owners is not None:
+            return self._matrix, self._owners
+        self._owner_ids = list(self.vectors)
+        matrix = np.vstack([self.vectors[id] for id in self._owner_ids])
+        owners = np.concatenate(
+            [
+                np.full(len(self.vectors[id]), position)
+                for position, id in enumerate(self._owner_ids)
+            ]
+        )
+        self._matrix, self._owners = matrix, owners
+        return matrix, owners
+
+    def scores(self, query_vector: list[float]) -> dict[int, float]:
+        if not self.vectors:
+            return {}
+        matrix, owners = self._stack()
+        query = self._normalize(np.asarray(query_vector, dtype=np.float32))
+        similarities = matrix @ query
+        best = np.full(len(self._owner_ids), -np.inf, dtype=np.float32)
+        np.maximum.at(best, owners, similarities)
+        return dict(zip(self._owner_ids, map(float, best)))
+
+
+vector_index = VectorIndex()
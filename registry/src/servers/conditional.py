@@ -0,0 +1,68 @@
+from datetime import datetime
+from email.utils import format_datetime
+from email.utils import parsedate_to_datetime
+
+from fastapi import Depends
+from fastapi import Request
+from fastapi import Response
+
+from .repository import ServerRepository
+from registry.src.errors import NotModifiedError
+from registry.src.errors import ServerNotFoundError
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def _check_validators(
+    request: Request, response: Response, version: int, updated_at: datetime
+) -> None:
+    headers = {
+        "ETag": f'W/"{version}"',
+        "Last-Modified": format_datetime(updated_at, usegmt=True),
+        "Cache-Control": "no-cache",
+    }
+    if if_none_match := request.headers.get("If-None-Match"):
+        if _etag_matches(if_none_match, headers["ETag"]):
+            raise NotModifiedError(headers)
+    elif if_modified_since := request.headers.get("If-Modified-Since"):
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            since = None
+        if since is not None and updated_at.replace(microsecond=0) <= since:
+            raise NotModifiedError(headers)
+    response.headers.update(headers)
+
+
+async def check_not_modified(
+    request: Request,
+    response: Response,
+    repo: ServerRepository = Depends(ServerRepository.get_read_instance),
+) -> None:
+    """Answer 304 when the catalogue did not change since the client's copy.
+
+    Any write bumps the catalogue version, so it validates every read endpoint
+    and is checked before the servers are loaded or serialized.
+    """
+    version, updated_at = await repo.get_catalogue_state()
+    _check_validators(request, response, version, updated_at)
+
+
+async def check_server_not_modified(
+    id: int,
+    request: Request,
+    response: Response,
+    repo: ServerRepository = Depends(ServerRepository.get_read_instance),
+) -> None:
+    """Answer 304 when the server did not change since the client's copy.
+
+    Writes stamp the catalogue version on the servers they touch, so writes to
+    other servers leave this server's validator, and the client's copy, valid.
+    """
+    state = await repo.get_server_state(id)
+    if state is None:
+        raise ServerNotFoundError(id)
+    _check_validators(request, response, *state)
@@ -0,0 +1,38 @@
+import asyncio
+import hashlib
+import json
+
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+
+from .schemas import ServerCreate
+from .schemas import ServerRegistration
+from .schemas import Tool
+from registry.src.search.embeddings import embed_server
+from registry.src.search.embeddings import Embedder
+from registry.src.settings import settings
+
+
+async def discover_tools(server_url: str) -> list[Tool]:
+    async with sse_client(server_url) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            tools = await session.list_tools()
+            return [Tool(**tool.model_dump(exclude_none=True)) for tool in tools.tools]
+
+
+def hash_tools(tools: list[Tool]) -> str:
+    normalized = sorted(
+        (tool.model_dump(mode="json") for tool in tools), key=lambda tool: tool["name"]
+    )
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode()).hexdigest()
+
+
+async def discover_server(data: ServerCreate, embedder: Embedder) -> ServerRegistration:
+    tools = await asyncio.wait_for(
+        discover_tools(data.url), timeout=settings.tool_discovery_timeout
+    )
+    embeddings = await embed_server(
+        embedder, name=data.name, description=data.description, tools=tools
+    )
+    return ServerRegistration(data=data, tools=tools, embeddings=embeddings)
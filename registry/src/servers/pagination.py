@@ -0,0 +1,18 @@
+import base64
+import json
+
+from pydantic import ValidationError
+
+from .schemas import ServerCursor
+from registry.src.errors import InvalidCursorError
+
+
+def encode_cursor(cursor: ServerCursor) -> str:
+    return base64.urlsafe_b64encode(cursor.model_dump_json().encode()).decode()
+
+
+def decode_cursor(cursor: str) -> ServerCursor:
+    try:
+        return ServerCursor.model_validate_json(base64.urlsafe_b64decode(cursor))
+    except (ValueError, ValidationError, json.JSONDecodeError):
+        raise InvalidCursorError(cursor)
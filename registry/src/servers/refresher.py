@@ -0,0 +1,152 @@
+import asyncio
+import random
+import time
+
+from sqlalchemy import func
+from sqlalchemy import select
+
+from .discovery import discover_tools
+from .discovery import hash_tools
+from .repository import ServerRepository
+from .schemas import Tool
+from .schemas import ToolFields
+from .service import ServerService
+from registry.src.database.session import async_engine
+from registry.src.database.session import session_maker
+from registry.src.errors import ServerNotFoundError
+from registry.src.logger import logger
+from registry.src.search.embeddings import embed_server
+from registry.src.search.embeddings import get_embedder
+from registry.src.settings import settings
+
+# Arbitrary key of the advisory lock that lets one process refresh at a time
+REFRESH_LOCK_KEY = 0x7E_F2_E5
+
+
+class ToolRefresher:
+    """Periodically re-runs tool discovery for every registered server.
+
+    Tools are rewritten only when the hash of the normalized tool list
+    changes; every attempt is recorded in `tool_refresh`.
+    """
+
+    def __init__(self) -> None:
+        self.task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self.task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.tool_refresh_interval)
+            try:
+                await self.refresh_all()
+            except Exception as error:
+                logger.error(f"Tool refresh failed:\n{error}")
+
+    async def refresh_all(self) -> None:
+        async with async_engine.connect() as connection:
+            lock = select(func.pg_try_advisory_lock(REFRESH_LOCK_KEY))
+            if not await connection.scalar(lock):
+                logger.info("Tool refresh is running in another process")
+                return
+            try:
+                await self._refresh_all()
+            finally:
+                unlock = select(func.pg_advisory_unlock(REFRESH_LOCK_KEY))
+                await connection.execute(unlock)
+
+    async def _refresh_all(self) -> None:
+        async with session_maker() as session:
+            ids = await ServerRepository(session).get_server_ids()
+        semaphore = asyncio.Semaphore(settings.tool_refresh_concurrency)
+        failures = 0
+
+        async def refresh(id: int) -> None:
+            nonlocal failures
+            await asyncio.sleep(random.uniform(0, settings.tool_refresh_jitter))
+            async with semaphore:
+                try:
+                    await self.refresh_server(id)
+                except Exception as error:
+                    failures += 1
+                    logger.error(f"Tool refresh failed for server {id}:\n{error!r}")
+
+        started = time.monotonic()
+        await asyncio.gather(*(refresh(id) for id in ids))
+        logger.info(
+            f"Refreshed tools of {len(ids)} servers ({failures=}) "
+            f"in {time.monotonic() - started:.1f}s"
+        )
+
+    async def refresh_server(self, id: int) -> None:
+        # Read when its turn comes, not when the cycle started
+        async with session_maker() as session:
+            try:
+                server = await ServerRepository(session).get_server(
+                    id, tools=ToolFields.none
+                )
+            except ServerNotFoundError:
+                return
+        started = time.monotonic()
+        try:
+            tools = await asyncio.wait_for(
+                discover_tools(server.url), timeout=settings.tool_discovery_timeout
+            )
+        except Exception as error:
+            logger.warning(f"Tool discovery failed for {server.url=}:\n{error!r}")
+            async with session_maker() as session, session.begin():
+                repo = ServerRepository(session)
+                if await repo.lock_server(server.id, server.url) is None:
+                    return
+                await repo.record_tool_refresh_failure(
+                    server.id,
+                    duration=time.monotonic() - started,
+                    error=f"{type(error).__name__}: {error}",
+                )
+            return
+
+        tools_hash = hash_tools(tools)
+        async with session_maker() as session:
+            repo = ServerRepository(session)
+            tool_refresh = await repo.find_tool_refresh(server.id)
+            if tool_refresh is not None and tool_refresh.tools_hash is not None:
+                stored_hash = tool_refresh.tools_hash
+            else:
+                stored_tools = await repo.get_tools(server.id)
+                stored_hash = hash_tools(
+                    [Tool.model_validate(tool) for tool in stored_tools]
+                )
+        changed = tools_hash != stored_hash
+
+        embeddings = None
+        if changed:
+            embeddings = await embed_server(
+                get_embedder(),
+                name=server.name,
+                description=server.description,
+                tools=tools,
+            )
+        async with session_maker() as session, session.begin():
+            service = ServerService(
+                repo=ServerRepository(session), embedder=get_embedder()
+            )
+            if await service.repo.lock_server(server.id, server.url) is None:
+                logger.info(f"Server {server.id} was deleted or moved during refresh")
+                return
+            if embeddings is not None:
+                logger.info(f"Tools of {server.url=} changed, updating")
+                await service.replace_tools(server, tools, embeddings)
+            await service.repo.record_tool_refresh(
+                server.id,
+                tools_hash=tools_hash,
+                duration=time.monotonic() - started,
+                changed=changed,
+            )
+
+
+tool_refresher = ToolRefresher()
@@ -1,19 +1,36 @@
+from datetime import datetime
+
 from fastapi import Depends
+from sqlalchemy import cast
 from sqlalchemy import delete
 from sqlalchemy import func
 from sqlalchemy import or_
 from sqlalchemy import Select
 from sqlalchemy import select
+from sqlalchemy import union
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.dialects.postgresql import REGCONFIG
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import noload
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.interfaces import ORMOption
 
 from .schemas import ServerCreate
+from .schemas import ServerRegistration
 from .schemas import ServerUpdate
 from .schemas import Tool
+from .schemas import ToolFields
+from registry.src.database import Catalogue
+from registry.src.database import DeletedServer
+from registry.src.database import get_read_session
 from registry.src.database import get_session
 from registry.src.database import Server
 from registry.src.database import Tool as DBTool
+from registry.src.database import ToolRefresh
 from registry.src.errors import ServerNotFoundError
+from registry.src.errors import ToolRefreshNotFoundError
+from registry.src.search.schemas import ServerEmbeddings
 
 
 class ServerRepository:
@@ -39,55 +56,389 @@ class ServerRepository:
         result = await self.session.execute(query)
         return result.scalars().all()
 
-    async def get_server(self, id: int) -> Server:
+    async def get_server(self, id: int, tools: ToolFields = ToolFields.full) -> Server:
         query = select(Server).filter(Server.id == id)
-        query = query.options(selectinload(Server.tools))
+        query = query.options(*self._tool_options(tools))
         result = await self.session.execute(query)
         server = result.scalars().first()
         if server is None:
             raise ServerNotFoundError(id)
         return server
 
-    async def create_server(self, data: ServerCreate, tools: list[Tool]) -> Server:
-        db_tools = self._convert_tools(tools, data.url)
-        server = Server(**data.model_dump(exclude_none=True), tools=db_tools)
-        self.session.add(server)
-        await self.session.flush()
-        return await self.get_server(server.id)
+    async def create_server(
+        self,
+        data: ServerCreate,
+        tools: list[Tool],
+        embeddings: ServerEmbeddings | None = None,
+    ) -> Server | None:
+        """Insert a server with its tools, or return None if its name or url is taken."""
+        query = (
+            insert(Server)
+            .values(
+                **data.model_dump(exclude_none=True),
+                embedding=embeddings.server if embeddings else None,
+            )
+            .on_conflict_do_nothing()
+            .returning(Server.id)
+        )
+        id = await self.session.scalar(query)
+        if id is None:
+            return None
+        await self._upsert_tools(tools, id, embeddings)
+        await self.bump_catalogue_version([id])
+        return await self.get_server(id)
+
+    async def create_servers(
+        self, registrations: list[ServerRegistration]
+    ) -> dict[str, int]:
+        """Insert servers with their tools, skipping taken names and urls.
+
+        Return the ids of the inserted servers by url.
+        """
+        if not registrations:
+            return {}
+        query = insert(Server).on_conflict_do_nothing().returning(Server.id, Server.url)
+        rows = [
+            dict(
+                **registration.data.model_dump(exclude_none=True),
+                embedding=registration.embeddings.server,
+            )
+            for registration in registrations
+        ]
+        ids = {url: id for id, url in await self.session.execute(query, rows)}
+        tool_rows = [
+            dict(
+                **tool.model_dump(exclude_none=True),
+                server_id=ids[registration.data.url],
+                embedding=registration.embeddings.tools.get(tool.name),
+            )
+            for registration in registrations
+            if registration.data.url in ids
+            for tool in registration.tools
+        ]
+        if tool_rows:
+            await self.session.execute(insert(DBTool), tool_rows)
+        if ids:
+            await self.bump_catalogue_version(list(ids.values()))
+        return ids
+
+    async def find_existing_servers(
+        self, names: list[str], urls: list[str]
+    ) -> list[Server]:
+        query = select(Server).where(
+            or_(
+                func.lower(Server.name).in_([name.lower() for name in names]),
+                Server.url.in_(urls),
+            )
+        )
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
+
+    async def get_servers(
+        self, ids: list[int], tools: ToolFields = ToolFields.full
+    ) -> list[Server]:
+        query = select(Server).where(Server.id.in_(ids))
+        query = query.options(*self._tool_options(tools))
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
 
-    async def get_all_servers(self) -> Select:
-        return select(Server).options(selectinload(Server.tools))
+    async def get_all_servers(self, tools: ToolFields = ToolFields.full) -> Select:
+        return select(Server).options(*self._tool_options(tools))
 
-    async def get_servers_by_urls(self, urls: list[str]) -> list[Server]:
+    async def get_servers_page(
+        self,
+        size: int,
+        after: int | None = None,
+        before: int | None = None,
+        tools: ToolFields = ToolFields.full,
+    ) -> list[Server]:
+        """Return up to `size + 1` servers next to a cursor, nearest first."""
+        query = select(Server).options(*self._tool_options(tools))
+        if before is not None:
+            query = query.where(Server.id < before).order_by(Server.id.desc())
+        else:
+            if after is not None:
+                query = query.where(Server.id > after)
+            query = query.order_by(Server.id)
+        result = await self.session.execute(query.limit(size + 1))
+        return list(result.scalars().all())
+
+    async def count_servers(self) -> int:
+        query = select(func.count()).select_from(Server)
+        return (await self.session.execute(query)).scalar_one()
+
+    async def lookup_servers(
+        self, q: str, limit: int, tools: ToolFields = ToolFields.full
+    ) -> list[Server]:
+        """Rank servers by full-text match on servers and their tools and by name similarity."""
+        tsquery = func.websearch_to_tsquery(cast("english", REGCONFIG), q)
+        # Each branch is answered by its own GIN index
+        candidates = union(
+            select(Server.id).where(Server.search_vector.bool_op("@@")(tsquery)),
+            select(Server.id).where(Server.name.bool_op("%")(q)),
+            select(DBTool.server_id).where(DBTool.search_vector.bool_op("@@")(tsquery)),
+        ).subquery()
+        tool_ranks = (
+            select(
+                DBTool.server_id,
+                func.max(func.ts_rank(DBTool.search_vector, tsquery)).label("rank"),
+            )
+            .where(DBTool.search_vector.bool_op("@@")(tsquery))
+            .group_by(DBTool.server_id)
+            .subquery()
+        )
+        rank = (
+            func.ts_rank(Server.search_vector, tsquery)
+            + func.coalesce(tool_ranks.c.rank, 0) * 0.5
+            + func.similarity(Server.name, q)
+        )
+        query = (
+            select(Server)
+            .join(candidates, candidates.c.id == Server.id)
+            .outerjoin(tool_ranks, tool_ranks.c.server_id == Server.id)
+            .order_by(rank.desc(), Server.id)
+            .limit(limit)
+            .options(*self._tool_options(tools))
+        )
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
+
+    async def get_search_servers(self, since: int | None = None) -> list[Server]:
+        """Return all servers, or those written after the `since` catalogue version."""
+        tools = selectinload(Server.tools).load_only(DBTool.name, DBTool.description)
+        query = select(Server).options(tools)
+        if since is not None:
+            query = query.where(Server.catalogue_version > since)
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
+
+    async def get_deleted_server_ids(self, since: int) -> list[int]:
+        query = select(DeletedServer.server_id).where(
+            DeletedServer.catalogue_version > since
+        )
+        return list((await self.session.scalars(query)).all())
+
+    async def get_servers_by_urls(
+        self, urls: list[str], tools: ToolFields = ToolFields.full
+    ) -> list[Server]:
         query = select(Server).where(Server.url.in_(urls))
+        query = query.options(*self._tool_options(tools))
         result = await self.session.execute(query)
         return list(result.scalars().all())
 
     async def delete_server(self, id: int) -> None:
-        query = delete(Server).where(Server.id == id)
-        await self.session.execute(query)
+        query = delete(Server).where(Server.id == id).returning(Server.id)
+        if await self.session.scalar(query) is None:
+            raise ServerNotFoundError(id)
+        version = await self.bump_catalogue_version()
+        self.session.add(DeletedServer(server_id=id, catalogue_version=version))
+        await self.session.flush()
 
     async def update_server(
-        self, id: int, data: ServerUpdate, tools: list[Tool]
+        self,
+        id: int,
+        data: ServerUpdate,
+        tools: list[Tool],
+        embeddings: ServerEmbeddings | None = None,
     ) -> Server:
         server = await self.get_server(id)
+        stored = {tool.name: tool for tool in server.tools}
         for key, value in data.model_dump(exclude_none=True).items():
             setattr(server, key, value)
-        server.tools.clear()
+        server.embedding = embeddings.server if embeddings else None
         await self.session.flush()
-        server.tools.extend(self._convert_tools(tools, server.url))
-        await self.session.flush()
-        await self.session.refresh(server)
-        return server
 
-    def _convert_tools(self, tools: list[Tool], url: str) -> list[DBTool]:
-        return [
-            DBTool(**tool.model_dump(exclude_none=True), server_url=url)
+        changed = [
+            tool
             for tool in tools
+            if tool.name not in stored
+            or stored[tool.name].description != tool.description
+            or stored[tool.name].input_schema != tool.input_schema
         ]
+        await self._upsert_tools(changed, id, embeddings)
+        names = [tool.name for tool in tools]
+        if stored.keys() - set(names):
+            query = delete(DBTool).where(
+                DBTool.server_id == id, DBTool.name.not_in(names)
+            )
+            await self.session.execute(query)
+
+        server = await self._reload_server(id)
+        await self.bump_catalogue_version([id])
+        return server
+
+    async def _upsert_tools(
+        self,
+        tools: list[Tool],
+        server_id: int,
+        embeddings: ServerEmbeddings | None = None,
+    ) -> None:
+        if not tools:
+            return
+        query = insert(DBTool).values(
+            [
+                dict(
+                    **tool.model_dump(exclude_none=True),
+                    server_id=server_id,
+                    embedding=embeddings.tools.get(tool.name) if embeddings else None,
+                )
+                for tool in tools
+            ]
+        )
+        query = query.on_conflict_do_update(
+            constraint="uq_tool_server_id_name",
+            set_=dict(
+                description=query.excluded.description,
+                input_schema=query.excluded.input_schema,
+                embedding=query.excluded.embedding,
+            ),
+        )
+        await self.session.execute(query)
+
+    async def _reload_server(self, id: int) -> Server:
+        query = (
+            select(Server)
+            .filter(Server.id == id)
+            .options(selectinload(Server.tools))
+            .execution_options(populate_existing=True)
+        )
+        return (await self.session.execute(query)).scalar_one()
+
+    async def get_catalogue_version(self) -> int:
+        query = select(Catalogue.version)
+        return (await self.session.execute(query)).scalar_one()
+
+    async def get_catalogue_state(self) -> tuple[int, datetime]:
+        query = select(Catalogue.version, Catalogue.updated_at)
+        version, updated_at = (await self.session.execute(query)).one()
+        return version, updated_at
+
+    async def get_server_state(self, id: int) -> tuple[int, datetime] | None:
+        query = select(Server.catalogue_version, Server.updated_at).where(
+            Server.id == id
+        )
+        row = (await self.session.execute(query)).one_or_none()
+        return None if row is None else (row.catalogue_version, row.updated_at)
+
+    async def bump_catalogue_version(self, server_ids: list[int] | None = None) -> int:
+        """Increment the catalogue version and stamp it on the written servers."""
+        query = (
+            update(Catalogue)
+            .values(version=Catalogue.version + 1, updated_at=func.now())
+            .returning(Catalogue.version)
+        )
+        version = (await self.session.execute(query)).scalar_one()
+        if server_ids:
+            stamp = (
+                update(Server)
+                .where(Server.id.in_(server_ids))
+                .values(catalogue_version=version, updated_at=func.now())
+                .execution_options(synchronize_session=False)
+            )
+            await self.session.execute(stamp)
+        return version
+
+    async def get_embeddings(
+        self, since: int | None = None
+    ) -> dict[int, list[list[float]]]:
+        server_query = select(Server.id, Server.embedding).where(
+            Server.embedding.is_not(None)
+        )
+        tool_query = select(DBTool.server_id, DBTool.embedding).where(
+            DBTool.embedding.is_not(None)
+        )
+        if since is not None:
+            server_query = server_query.where(Server.catalogue_version > since)
+            tool_query = tool_query.join(Server).where(Server.catalogue_version > since)
+        embeddings: dict[int, list[list[float]]] = {}
+        for query in (server_query, tool_query):
+            for server_id, embedding in await self.session.execute(query):
+                embeddings.setdefault(server_id, []).append(embedding)
+        return embeddings
+
+    async def get_server_ids(self) -> list[int]:
+        result = await self.session.scalars(select(Server.id).order_by(Server.id))
+        return list(result.all())
+
+    async def lock_server(self, id: int, url: str) -> Server | None:
+        """Lock a server row, unless it was deleted or moved to another url."""
+        query = (
+            select(Server)
+            .where(Server.id == id, Server.url == url)
+            .options(noload(Server.tools))
+            .with_for_update()
+        )
+        return (await self.session.scalars(query)).first()
+
+    async def get_tools(self, server_id: int) -> list[DBTool]:
+        query = select(DBTool).where(DBTool.server_id == server_id)
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
+
+    async def find_tool_refresh(self, server_id: int) -> ToolRefresh | None:
+        return await self.session.get(ToolRefresh, server_id)
+
+    async def get_tool_refresh(self, server_id: int) -> ToolRefresh:
+        tool_refresh = await self.find_tool_refresh(server_id)
+        if tool_refresh is None:
+            raise ToolRefreshNotFoundError(server_id)
+        return tool_refresh
+
+    async def record_tool_refresh(
+        self, server_id: int, tools_hash: str, duration: float, changed: bool
+    ) -> None:
+        values = dict(
+            tools_hash=tools_hash,
+            refreshed_at=func.now(),
+            duration=duration,
+            consecutive_failures=0,
+        )
+        if changed:
+            values["changed_at"] = func.now()
+        query = insert(ToolRefresh).values(server_id=server_id, failures=0, **values)
+        query = query.on_conflict_do_update(
+            index_elements=[ToolRefresh.server_id], set_=values
+        )
+        await self.session.execute(query)
+
+    async def record_tool_refresh_failure(
+        self, server_id: int, duration: float, error: str
+    ) -> None:
+        values = dict(refreshed_at=func.now(), duration=duration, last_error=error)
+        query = insert(ToolRefresh).values(
+            server_id=server_id, failures=1, consecutive_failures=1, **values
+        )
+        query = query.on_conflict_do_update(
+            index_elements=[ToolRefresh.server_id],
+            set_=dict(
+                failures=ToolRefresh.failures + 1,
+                consecutive_failures=ToolRefresh.consecutive_failures + 1,
+                **values,
+            ),
+        )
+        await self.session.execute(query)
+
+    @staticmethod
+    def _tool_options(tools: ToolFields) -> list[ORMOption]:
+        match tools:
+            case ToolFields.full:
+                return [selectinload(Server.tools)]
+            case ToolFields.summary:
+                columns = (DBTool.name, DBTool.description)
+                return [selectinload(Server.tools).load_only(*columns)]
+            case ToolFields.name:
+                return [selectinload(Server.tools).load_only(DBTool.name)]
+            case ToolFields.none:
+                return [noload(Server.tools)]
 
     @classmethod
     def get_new_instance(
         cls, session: AsyncSession = Depends(get_session)
     ) -> "ServerRepository":
         return cls(session)
+
+    @classmethod
+    def get_read_instance(
+        cls, session: AsyncSession = Depends(get_read_session)
+    ) -> "ServerRepository":
+        return cls(session)
@@ -1,6 +1,11 @@
+from collections.abc import AsyncIterator
+
 from fastapi import APIRouter
 from fastapi import Depends
 from fastapi import Query
+from fastapi import Request
+from fastapi import Response
+from fastapi.responses import StreamingResponse
 from fastapi_pagination import add_pagination
 from fastapi_pagination import Page
 from fastapi_pagination import Params
@@ -8,13 +13,37 @@ from fastapi_pagination.ext.sqlalchemy import paginate
 from sqlalchemy import Select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from .conditional import check_not_modified
+from .conditional import check_server_not_modified
+from .repository import ServerRepository
+from .schemas import SERVER_LIST_SCHEMAS
+from .schemas import SERVER_PAGE_SCHEMAS
+from .schemas import SERVER_SCHEMAS
+from .schemas import ServerBulkResult
 from .schemas import ServerCreate
+from .schemas import ServerCursorPage
+from .schemas import ServerProjection
 from .schemas import ServerUpdate
 from .schemas import ServerWithTools
+from .schemas import ToolFields
+from .schemas import ToolRefreshRead
 from .service import ServerService
-from registry.src.database import get_session
+from registry.src.database import get_read_session
 from registry.src.database import Server
-from registry.src.search.schemas import SearchServer
+from registry.src.database import ToolRefresh
+from registry.src.database.session import open_read_session
+from registry.src.responses import json_response
+from registry.src.search.admission import admit_search
+from registry.src.search.admission import admit_stream
+from registry.src.search.admission import check_rate_limit
+from registry.src.search.catalogue import search_catalogue
+from registry.src.search.embeddings import Embedder
+from registry.src.search.embeddings import get_embedder
+from registry.src.search.prompt_builder import get_rows_budget
+from registry.src.search.schemas import SearchBatch
+from registry.src.search.schemas import SearchMode
+from registry.src.search.schemas import SearchStats
+from registry.src.search.service import group_queries
 from registry.src.search.service import SearchService
 
 
@@ -29,18 +58,106 @@ async def create(
     return await service.create(data)
 
 
-@router.get("/search", response_model=list[ServerWithTools])
+@router.post("/bulk", response_model=list[ServerBulkResult])
+async def bulk_create(
+    data: list[ServerCreate],
+    service: ServerService = Depends(ServerService.get_new_instance),
+) -> list[ServerBulkResult]:
+    return await service.bulk_create(data)
+
+
+@router.get(
+    "/search",
+    response_model=list[ServerProjection],
+    dependencies=[Depends(admit_search)],
+)
 async def search(
     query: str,
-    service: ServerService = Depends(ServerService.get_new_instance),
+    request: Request,
+    response: Response,
+    mode: SearchMode = SearchMode.llm,
+    tools: ToolFields = ToolFields.full,
+    service: ServerService = Depends(ServerService.get_read_instance),
+    search_service: SearchService = Depends(SearchService.get_new_instance),
+) -> Response:
+    snapshot = await search_catalogue.get_snapshot()
+    server_urls = await search_service.get_server_urls(
+        snapshot=snapshot, query=query, mode=mode
+    )
+    servers = await service.get_servers_by_urls(server_urls=server_urls, tools=tools)
+    return json_response(request, response, servers, SERVER_LIST_SCHEMAS[tools])
+
+
+@router.get("/lookup", response_model=list[ServerProjection])
+async def lookup(
+    q: str,
+    request: Request,
+    response: Response,
+    limit: int = Query(10, ge=1, le=100),
+    tools: ToolFields = ToolFields.full,
+    service: ServerService = Depends(ServerService.get_read_instance),
+) -> Response:
+    """Keyword search over server and tool names and descriptions, without the LLM."""
+    servers = await service.lookup_servers(q=q, limit=limit, tools=tools)
+    return json_response(request, response, servers, SERVER_LIST_SCHEMAS[tools])
+
+
+@router.get("/search/stream")
+async def search_stream(
+    query: str,
+    request: Request,
+    embedder: Embedder = Depends(get_embedder),
+    search_service: SearchService = Depends(SearchService.get_new_instance),
+) -> StreamingResponse:
+    """Stream one NDJSON `SearchStep` per solution step as soon as it is parsed."""
+    # Rejected here, as errors raised by the body come after the response started
+    get_rows_budget(query)
+    snapshot = await search_catalogue.get_snapshot()
+    solution_steps = search_service.stream_solution_steps(
+        snapshot=snapshot, query=query
+    )
+
+    async def lines() -> AsyncIterator[str]:
+        # Request-scoped sessions are closed before a streaming body is sent
+        async with await open_read_session() as session:
+            service = ServerService(repo=ServerRepository(session), embedder=embedder)
+            async for search_step in service.get_search_steps(solution_steps):
+                yield search_step.model_dump_json() + "\n"
+
+    body = await admit_stream(request, lines())
+    return StreamingResponse(body, media_type="application/x-ndjson")
+
+
+@router.post("/search/batch")
+async def search_batch(
+    data: SearchBatch,
+    request: Request,
+    embedder: Embedder = Depends(get_embedder),
     search_service: SearchService = Depends(SearchService.get_new_instance),
-) -> list[Server]:
-    servers = await service.get_search_servers()
-    formatted_servers = [SearchServer.model_validate(server) for server in servers]
-    server_urls = await search_service.get_fitting_servers(
-        servers=formatted_servers, query=query
+) -> StreamingResponse:
+    """Stream one NDJSON `SearchBatchItem` per query as soon as it is answered."""
+    groups = group_queries(data.queries)
+    # Charged per distinct query, each of which is admitted as a search of its own
+    check_rate_limit(request, cost=len(groups))
+    snapshot = await search_catalogue.get_snapshot()
+    results = search_service.search_batch(
+        snapshot=snapshot, groups=groups, mode=data.mode
     )
-    return await service.get_servers_by_urls(server_urls=server_urls)
+
+    async def lines() -> AsyncIterator[str]:
+        async with await open_read_session() as session:
+            service = ServerService(repo=ServerRepository(session), embedder=embedder)
+            async for item in service.get_batch_items(results):
+                yield item.model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.get("/search/stats", response_model=SearchStats)
+async def search_stats(
+    search_service: SearchService = Depends(SearchService.get_new_instance),
+) -> SearchStats:
+    return await search_service.get_stats()
 
 
 @router.delete("/{id}")
@@ -50,30 +167,79 @@ async def delete_server(
     return await service.delete_server(id=id)
 
 
-@router.get("/", response_model=Page[ServerWithTools])
+@router.get(
+    "/",
+    response_model=Page[ServerProjection],
+    dependencies=[Depends(check_not_modified)],
+)
 async def get_all_servers(
+    request: Request,
+    response: Response,
     params: Params = Depends(),
-    service: ServerService = Depends(ServerService.get_new_instance),
-    session: AsyncSession = Depends(get_session),
-) -> Page[Server]:
-    servers: Select = await service.get_all_servers()
-    return await paginate(session, servers, params)
+    tools: ToolFields = ToolFields.full,
+    service: ServerService = Depends(ServerService.get_read_instance),
+    session: AsyncSession = Depends(get_read_session),
+) -> Response:
+    servers: Select = await service.get_all_servers(tools=tools)
+    page = await paginate(
+        session,
+        servers,
+        params,
+        transformer=lambda items: service.project_servers(items, tools),
+    )
+    return json_response(request, response, page, SERVER_PAGE_SCHEMAS[tools])
 
 
-@router.get("/{id}", response_model=ServerWithTools)
+@router.get(
+    "/cursor",
+    response_model=ServerCursorPage,
+    dependencies=[Depends(check_not_modified)],
+)
+async def get_servers_page(
+    request: Request,
+    response: Response,
+    cursor: str | None = None,
+    size: int = Query(50, ge=1, le=100),
+    include_total: bool = False,
+    tools: ToolFields = ToolFields.full,
+    service: ServerService = Depends(ServerService.get_read_instance),
+) -> Response:
+    page = await service.get_servers_page(
+        size=size, cursor=cursor, include_total=include_total, tools=tools
+    )
+    return json_response(request, response, page, ServerCursorPage)
+
+
+@router.get(
+    "/{id}",
+    response_model=ServerProjection,
+    dependencies=[Depends(check_server_not_modified)],
+)
 async def get_server_by_id(
     id: int,
-    service: ServerService = Depends(ServerService.get_new_instance),
-) -> Server:
-    return await service.get_server_by_id(id=id)
+    request: Request,
+    response: Response,
+    tools: ToolFields = ToolFields.full,
+    service: ServerService = Depends(ServerService.get_read_instance),
+) -> Response:
+    server = await service.get_server_by_id(id=id, tools=tools)
+    return json_response(request, response, server, SERVER_SCHEMAS[tools])
 
 
-@router.get("", response_model=list[ServerWithTools])
+@router.get(
+    "",
+    response_model=list[ServerProjection],
+    dependencies=[Depends(check_not_modified)],
+)
 async def get_servers_by_ids(
+    request: Request,
+    response: Response,
     ids: list[int] = Query(...),
-    service: ServerService = Depends(ServerService.get_new_instance),
-) -> list[Server]:
-    return await service.get_servers_by_ids(ids=ids)
+    tools: ToolFields = ToolFields.full,
+    service: ServerService = Depends(ServerService.get_read_instance),
+) -> Response:
+    servers = await service.get_servers_by_ids(ids=ids, tools=tools)
+    return json_response(request, response, servers, SERVER_LIST_SCHEMAS[tools])
 
 
 @router.put("/{id}", response_model=ServerWithTools)
@@ -83,3 +249,11 @@ async def update_server(
     service: ServerService = Depends(ServerService.get_new_instance),
 ) -> Server:
     return await service.update_server(id=id, data=data)
+
+
+@router.get("/{id}/refresh", response_model=ToolRefreshRead)
+async def get_tool_refresh(
+    id: int,
+    service: ServerService = Depends(ServerService.get_new_instance),
+) -> ToolRefresh:
+    return await service.get_tool_refresh(id=id)
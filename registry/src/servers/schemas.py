@@ -1,9 +1,13 @@
+from datetime import datetime
+from enum import StrEnum
 from typing import Any
 
+from fastapi_pagination import Page
 from pydantic import ConfigDict
 from pydantic import Field
 
 from registry.src.base_schema import BaseSchema
+from registry.src.search.schemas import ServerEmbeddings
 
 
 class Tool(BaseSchema):
@@ -28,8 +32,118 @@ class ServerWithTools(ServerRead):
     tools: list[Tool]
 
 
+class ToolSummary(BaseSchema):
+    name: str
+    description: str
+
+
+class ToolName(BaseSchema):
+    name: str
+
+
+class ServerWithToolSummaries(ServerRead):
+    tools: list[ToolSummary]
+
+
+class ServerWithToolNames(ServerRead):
+    tools: list[ToolName]
+
+
+class ToolFields(StrEnum):
+    """How much of each tool the server read endpoints return."""
+
+    full = "full"
+    summary = "summary"
+    name = "name"
+    none = "none"
+
+
+# The widest schema goes first, so validating a response picks the exact match
+ServerProjection = (
+    ServerWithTools | ServerWithToolSummaries | ServerWithToolNames | ServerRead
+)
+
+SERVER_SCHEMAS: dict[ToolFields, type[ServerRead]] = {
+    ToolFields.full: ServerWithTools,
+    ToolFields.summary: ServerWithToolSummaries,
+    ToolFields.name: ServerWithToolNames,
+    ToolFields.none: ServerRead,
+}
+
+SERVER_LIST_SCHEMAS: dict[ToolFields, Any] = {
+    ToolFields.full: list[ServerWithTools],
+    ToolFields.summary: list[ServerWithToolSummaries],
+    ToolFields.name: list[ServerWithToolNames],
+    ToolFields.none: list[ServerRead],
+}
+
+SERVER_PAGE_SCHEMAS: dict[ToolFields, Any] = {
+    ToolFields.full: Page[ServerWithTools],
+    ToolFields.summary: Page[ServerWithToolSummaries],
+    ToolFields.name: Page[ServerWithToolNames],
+    ToolFields.none: Page[ServerRead],
+}
+
+
+class ServerCursor(BaseSchema):
+    """Position in the server list: strictly after or before a server id."""
+
+    id: int
+    backwards: bool = False
+
+
+class ServerCursorPage(BaseSchema):
+    items: list[ServerProjection]
+    next_cursor: str | None
+    prev_cursor: str | None
+    total: int | None = None
+
+
 class ServerUpdate(BaseSchema):
     name: str | None = None
     description: str | None = None
     url: str | None = None
     logo: str | None = None
+
+
+class ServerRegistration(BaseSchema):
+    data: ServerCreate
+    tools: list[Tool]
+    embeddings: ServerEmbeddings
+
+
+class BulkStatus(StrEnum):
+    created = "created"
+    exists = "exists"
+    duplicate = "duplicate"
+    failed = "failed"
+
+
+class ServerBulkResult(BaseSchema):
+    name: str
+    url: str
+    status: BulkStatus
+    id: int | None = None
+    error: str | None = None
+
+
+class SearchStep(BaseSchema):
+    step_description: str
+    best_server: ServerWithTools | None
+    additional_servers: list[ServerWithTools]
+
+
+class SearchBatchItem(BaseSchema):
+    query: str
+    servers: list[ServerWithTools]
+    error: str | None = None
+
+
+class ToolRefreshRead(BaseSchema):
+    server_id: int
+    refreshed_at: datetime
+    duration: float
+    changed_at: datetime | None
+    failures: int
+    consecutive_failures: int
+    last_error: str | None
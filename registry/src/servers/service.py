@@ -1,86 +1,261 @@
+import asyncio
+from collections.abc import AsyncIterator
+from collections.abc import Sequence
 from typing import Self
 
 from fastapi import Depends
-from mcp import ClientSession
-from mcp.client.sse import sse_client
 from sqlalchemy import Select
+from sqlalchemy.exc import IntegrityError
 
+from .discovery import discover_server
+from .discovery import discover_tools
+from .pagination import decode_cursor
+from .pagination import encode_cursor
 from .repository import ServerRepository
+from .schemas import BulkStatus
+from .schemas import SearchBatchItem
+from .schemas import SearchStep
+from .schemas import SERVER_SCHEMAS
+from .schemas import ServerBulkResult
 from .schemas import ServerCreate
+from .schemas import ServerCursor
+from .schemas import ServerCursorPage
 from .schemas import ServerRead
+from .schemas import ServerRegistration
 from .schemas import ServerUpdate
+from .schemas import ServerWithTools
 from .schemas import Tool
+from .schemas import ToolFields
 from registry.src.database import Server
+from registry.src.database import ToolRefresh
+from registry.src.database.session import open_read_session
 from registry.src.errors import ServerAlreadyExistsError
 from registry.src.errors import ServerNotFoundError
 from registry.src.logger import logger
+from registry.src.search.catalogue import search_catalogue
+from registry.src.search.embeddings import embed_server
+from registry.src.search.embeddings import Embedder
+from registry.src.search.embeddings import get_embedder
+from registry.src.search.schemas import BatchSearchResult
+from registry.src.search.schemas import ServerEmbeddings
+from registry.src.search.schemas import ServerSelection
+from registry.src.settings import settings
 
 
 class ServerService:
 
-    def __init__(self, repo: ServerRepository) -> None:
+    def __init__(self, repo: ServerRepository, embedder: Embedder) -> None:
         self.repo = repo
+        self.embedder = embedder
 
     async def create(self, data: ServerCreate) -> Server:
-        await self._assure_server_not_exists(name=data.name, url=data.url)
-        tools = await self._get_tools(data.url)
-        return await self.repo.create_server(data, tools)
-
-    async def _get_tools(self, server_url: str) -> list[Tool]:
-        async with sse_client(server_url) as (read, write):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
-                tools = await session.list_tools()
-                return [
-                    Tool(**tool.model_dump(exclude_none=True)) for tool in tools.tools
-                ]
+        registration = await discover_server(data, self.embedder)
+        return await self._save_registration(registration)
+
+    async def register(self, registration: ServerRegistration) -> Server:
+        """Save a server whose tools were discovered outside of this session."""
+        return await self._save_registration(registration)
+
+    async def _save_registration(self, registration: ServerRegistration) -> Server:
+        data = registration.data
+        server = await self.repo.create_server(
+            data, registration.tools, registration.embeddings
+        )
+        if server is None:
+            conflicts = await self._find_conflicts(name=data.name, url=data.url)
+            raise ServerAlreadyExistsError(conflicts)
+        search_catalogue.refresh_after_commit(self.repo.session)
+        return server
+
+    async def bulk_create(self, items: list[ServerCreate]) -> list[ServerBulkResult]:
+        results: list[ServerBulkResult | None] = [None] * len(items)
+        # A short session of its own, so that no transaction idles during discovery
+        async with await open_read_session(read_primary=True) as session:
+            existing = await ServerRepository(session).find_existing_servers(
+                names=[item.name for item in items], urls=[item.url for item in items]
+            )
+        taken_names = {server.name.lower() for server in existing}
+        taken_urls = {server.url for server in existing}
+        pending: list[tuple[int, ServerCreate]] = []
+        seen_names: set[str] = set()
+        seen_urls: set[str] = set()
+        for position, item in enumerate(items):
+            status = None
+            if item.name.lower() in taken_names or item.url in taken_urls:
+                status = BulkStatus.exists
+            elif item.name.lower() in seen_names or item.url in seen_urls:
+                status = BulkStatus.duplicate
+            if status is not None:
+                results[position] = ServerBulkResult(
+                    name=item.name, url=item.url, status=status
+                )
+                continue
+            seen_names.add(item.name.lower())
+            seen_urls.add(item.url)
+            pending.append((position, item))
+
+        semaphore = asyncio.Semaphore(settings.tool_discovery_concurrency)
+
+        async def discover(item: ServerCreate) -> ServerRegistration:
+            async with semaphore:
+                return await discover_server(item, self.embedder)
+
+        outcomes = await asyncio.gather(
+            *(discover(item) for _, item in pending), return_exceptions=True
+        )
+        registered: list[tuple[int, ServerRegistration]] = []
+        for (position, item), outcome in zip(pending, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.warning(f"Tool discovery failed for {item.url=}:\n{outcome!r}")
+                results[position] = ServerBulkResult(
+                    name=item.name,
+                    url=item.url,
+                    status=BulkStatus.failed,
+                    error=f"{type(outcome).__name__}: {outcome}",
+                )
+            else:
+                registered.append((position, outcome))
+
+        ids = await self.repo.create_servers(
+            [registration for _, registration in registered]
+        )
+        search_catalogue.refresh_after_commit(self.repo.session)
+        for position, registration in registered:
+            data = registration.data
+            # Taken by a concurrent registration after the existence check
+            id = ids.get(data.url)
+            results[position] = ServerBulkResult(
+                name=data.name,
+                url=data.url,
+                status=BulkStatus.exists if id is None else BulkStatus.created,
+                id=id,
+            )
+        return [result for result in results if result is not None]
 
     async def delete_server(self, id: int) -> None:
-        await self._assure_server_found(id)
         await self.repo.delete_server(id=id)
+        search_catalogue.refresh_after_commit(self.repo.session)
+
+    async def get_all_servers(self, tools: ToolFields = ToolFields.full) -> Select:
+        return await self.repo.get_all_servers(tools=tools)
 
-    async def get_all_servers(self) -> Select:
-        return await self.repo.get_all_servers()
+    async def get_servers_page(
+        self,
+        size: int,
+        cursor: str | None = None,
+        include_total: bool = False,
+        tools: ToolFields = ToolFields.full,
+    ) -> ServerCursorPage:
+        position = decode_cursor(cursor) if cursor else None
+        backwards = position is not None and position.backwards
+        servers = await self.repo.get_servers_page(
+            size,
+            after=position.id if position and not backwards else None,
+            before=position.id if position and backwards else None,
+            tools=tools,
+        )
+        has_more = len(servers) > size
+        servers = servers[:size]
+        if backwards:
+            servers.reverse()
 
-    async def get_server_by_id(self, id: int) -> Server:
-        await self._assure_server_found(id)
-        return await self.repo.get_server(id=id)
+        next_cursor = prev_cursor = None
+        if servers:
+            if has_more or backwards:
+                next_cursor = encode_cursor(ServerCursor(id=servers[-1].id))
+            if position is not None and (has_more or not backwards):
+                prev_cursor = encode_cursor(
+                    ServerCursor(id=servers[0].id, backwards=True)
+                )
+        return ServerCursorPage(
+            items=self.project_servers(servers, tools),
+            next_cursor=next_cursor,
+            prev_cursor=prev_cursor,
+            total=await self.repo.count_servers() if include_total else None,
+        )
 
-    async def get_servers_by_ids(self, ids: list[int]) -> list[Server]:
-        servers = []
+    async def get_server_by_id(
+        self, id: int, tools: ToolFields = ToolFields.full
+    ) -> Server:
+        return await self.repo.get_server(id=id, tools=tools)
+
+    async def get_servers_by_ids(
+        self, ids: list[int], tools: ToolFields = ToolFields.full
+    ) -> list[Server]:
+        found = await self.repo.get_servers(ids, tools=tools)
+        servers = {server.id: server for server in found}
         for id in ids:
-            await self._assure_server_found(id)
-            servers.append(await self.repo.get_server(id=id))
-        return servers
+            if id not in servers:
+                raise ServerNotFoundError(id)
+        return [servers[id] for id in ids]
 
     async def update_server(self, id: int, data: ServerUpdate) -> Server:
-        await self._assure_server_found(id)
-        await self._assure_server_not_exists(name=data.name, url=data.url)
-        if data.url:
-            tools = await self._get_tools(data.url)
-        else:
-            server = await self.repo.get_server(id=id)
-            tools = await self._get_tools(server.url)
-        return await self.repo.update_server(id, data, tools)
-
-    async def _assure_server_found(self, id: int) -> None:
-        if not await self.repo.find_servers(id=id):
-            raise ServerNotFoundError(id)
-
-    async def _assure_server_not_exists(self, **kwargs) -> None:
-        if servers := await self.repo.find_servers(**kwargs):
-            dict_servers = [
-                ServerRead.model_validate(server).model_dump() for server in servers
-            ]
-            raise ServerAlreadyExistsError(dict_servers)
+        # Checked in a short session, so no transaction idles during discovery
+        async with await open_read_session(read_primary=True) as session:
+            service = ServerService(ServerRepository(session), self.embedder)
+            server = await service.get_server_by_id(id, tools=ToolFields.none)
+            if data.name is not None or data.url is not None:
+                conflicts = await service._find_conflicts(
+                    name=data.name, url=data.url, exclude_id=id
+                )
+                if conflicts:
+                    raise ServerAlreadyExistsError(conflicts)
+        tools = await asyncio.wait_for(
+            discover_tools(data.url or server.url),
+            timeout=settings.tool_discovery_timeout,
+        )
+        embeddings = await embed_server(
+            self.embedder,
+            name=data.name or server.name,
+            description=data.description or server.description,
+            tools=tools,
+        )
+        try:
+            # A savepoint, so the session is still usable to report the conflict
+            async with self.repo.session.begin_nested():
+                server = await self.repo.update_server(id, data, tools, embeddings)
+        except IntegrityError:
+            # Taken by a concurrent write after the conflict check
+            conflicts = await self._find_conflicts(
+                name=data.name, url=data.url, exclude_id=id
+            )
+            raise ServerAlreadyExistsError(conflicts) from None
+        search_catalogue.refresh_after_commit(self.repo.session)
+        return server
+
+    async def replace_tools(
+        self, server: Server, tools: list[Tool], embeddings: ServerEmbeddings
+    ) -> Server:
+        server = await self.repo.update_server(
+            server.id, ServerUpdate(), tools, embeddings
+        )
+        search_catalogue.refresh_after_commit(self.repo.session)
+        return server
+
+    async def get_tool_refresh(self, id: int) -> ToolRefresh:
+        return await self.repo.get_tool_refresh(server_id=id)
+
+    async def _find_conflicts(
+        self, name: str | None, url: str | None, exclude_id: int | None = None
+    ) -> list[dict]:
+        servers = await self.repo.find_servers(name=name, url=url)
+        return [
+            ServerRead.model_validate(server).model_dump()
+            for server in servers
+            if server.id != exclude_id
+        ]
 
-    async def get_search_servers(self) -> list[Server]:
-        servers_query = await self.repo.get_all_servers()
-        servers = (await self.repo.session.execute(servers_query)).scalars().all()
-        return list(servers)
+    async def lookup_servers(
+        self, q: str, limit: int, tools: ToolFields = ToolFields.full
+    ) -> list[Server]:
+        return await self.repo.lookup_servers(q=q, limit=limit, tools=tools)
 
-    async def get_servers_by_urls(self, server_urls: list[str]) -> list[Server]:
-        servers = await self.repo.get_servers_by_urls(urls=server_urls)
+    async def get_servers_by_urls(
+        self, server_urls: list[str], tools: ToolFields = ToolFields.full
+    ) -> list[Server]:
+        servers = await self.repo.get_servers_by_urls(urls=server_urls, tools=tools)
+        positions = {url: position for position, url in enumerate(server_urls)}
+        servers.sort(key=lambda server: positions[server.url])
         if len(server_urls) != len(servers):
             retrieved_server_urls = {server.url for server in servers}
             missing_server_urls = set(server_urls) - retrieved_server_urls
@@ -89,8 +264,65 @@ class ServerService:
             )
         return servers
 
+    @staticmethod
+    def project_servers(
+        servers: Sequence[Server], tools: ToolFields
+    ) -> list[ServerRead]:
+        schema = SERVER_SCHEMAS[tools]
+        return [schema.model_validate(server) for server in servers]
+
+    async def get_search_steps(
+        self, selections: AsyncIterator[ServerSelection]
+    ) -> AsyncIterator[SearchStep]:
+        async for selection in selections:
+            best_url = selection.best_server_url
+            additional_urls = [
+                url for url in selection.additional_server_urls if url != best_url
+            ]
+            urls = [best_url, *additional_urls] if best_url else additional_urls
+            servers = await self.get_servers_by_urls(urls)
+            servers_by_url = {
+                server.url: ServerWithTools.model_validate(server) for server in servers
+            }
+            # Return the connection while the next step is generated
+            await self.repo.session.commit()
+            yield SearchStep(
+                step_description=selection.step_description,
+                best_server=servers_by_url.get(best_url) if best_url else None,
+                additional_servers=[
+                    servers_by_url[url]
+                    for url in additional_urls
+                    if url in servers_by_url
+                ],
+            )
+
+    async def get_batch_items(
+        self, results: AsyncIterator[BatchSearchResult]
+    ) -> AsyncIterator[SearchBatchItem]:
+        async for result in results:
+            servers = await self.get_servers_by_urls(result.server_urls)
+            server_models = [
+                ServerWithTools.model_validate(server) for server in servers
+            ]
+            # Return the connection while the next queries are answered
+            await self.repo.session.commit()
+            for query in result.queries:
+                yield SearchBatchItem(
+                    query=query, servers=server_models, error=result.error
+                )
+
     @classmethod
     def get_new_instance(
-        cls, repo: ServerRepository = Depends(ServerRepository.get_new_instance)
+        cls,
+        repo: ServerRepository = Depends(ServerRepository.get_new_instance),
+        embedder: Embedder = Depends(get_embedder),
+    ) -> Self:
+        return cls(repo=repo, embedder=embedder)
+
+    @classmethod
+    def get_read_instance(
+        cls,
+        repo: ServerRepository = Depends(ServerRepository.get_read_instance),
+        embedder: Embedder = Depends(get_embedder),
     ) -> Self:
-        return cls(repo=repo)
+        return cls(repo=repo, embedder=embedder)
@@ -1,5 +1,7 @@
 from pathlib import Path
+from typing import Literal
 
+from pydantic import IPvAnyNetwork
 from pydantic_settings import BaseSettings
 from pydantic_settings import SettingsConfigDict
 
@@ -12,14 +14,56 @@ class Settings(BaseSettings):
     postgres_password: str
     postgres_host: str
     postgres_port: int
+    postgres_replica_host: str | None = None
+    postgres_replica_port: int | None = None
+    replica_lag_window: int = 10
 
     db_pool_size: int = 50
     db_max_overflow: int = 25
     log_dir: Path = Path("logs")
+    trace_exporter: Literal["file", "memory", "none"] = "file"
+    compression_min_size: int = 1024
+    compression_level: int = 6
+    tool_discovery_concurrency: int = 16
+    tool_discovery_timeout: float = 30.0
+    tool_refresh_interval: float = 3600.0
+    tool_refresh_concurrency: int = 8
+    tool_refresh_jitter: float = 60.0
+    registration_workers: int = 4
+    registration_max_attempts: int = 3
+    registration_retry_delay: float = 10.0
+    registration_poll_interval: float = 5.0
+    # How long a claimed job stays running before another worker may reclaim it
+    registration_lease: float = 300.0
     llm_proxy: str | None = None
     openai_api_key: str
     llm_model: str = "gpt-4o-mini"
     openai_api_base: str = "https://api.openai.com/v1"
+    search_shortlist_size: int = 50
+    search_vector_limit: int = 10
+    search_keyword_weight: float = 0.3
+    catalogue_refresh_interval: float = 5.0
+    search_prompt_tokens: int = 30000
+    # Capped at the prompt budget left after the template and the query
+    search_shard_tokens: int = 28000
+    search_shard_concurrency: int = 8
+    search_batch_concurrency: int = 8
+    # No larger than search_rate_burst, or full batches are never admitted
+    search_batch_size: int = 20
+    search_concurrency: int = 32
+    search_queue_size: int = 64
+    search_queue_timeout: float = 30.0
+    search_rate_limit: float = 5.0
+    search_rate_burst: int = 20
+    search_rate_clients: int = 10000
+    # Proxies, such as the MCP server, whose forwarded client ids are rate limited
+    search_trusted_networks: list[IPvAnyNetwork] = []
+    search_cache_backend: Literal["memory", "postgres"] = "memory"
+    search_cache_size: int = 1024
+    search_cache_ttl: int = 3600
+    embedding_backend: Literal["openai", "hashing"] = "openai"
+    embedding_model: str = "text-embedding-3-small"
+    embedding_dimensions: int = 512
 
     @property
     def database_url(self) -> str:
@@ -35,5 +79,14 @@ class Settings(BaseSettings):
     def database_url_async(self) -> str:
         return f"postgresql+asyncpg://{self.database_url}"
 
+    @property
+    def database_url_replica_async(self) -> str | None:
+        if self.postgres_replica_host is None:
+            return None
+        auth_data = f"{self.postgres_user}:{self.postgres_password}"
+        port = self.postgres_replica_port or self.postgres_port
+        host = f"{self.postgres_replica_host}:{port}"
+        return f"postgresql+asyncpg://{auth_data}@{host}/{self.postgres_db}"
+
 
 settings = Settings()
@@ -0,0 +1,86 @@
+import threading
+from collections.abc import Sequence
+from pathlib import Path
+
+from opentelemetry import trace
+from opentelemetry.propagate import extract
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export import SpanExporter
+from opentelemetry.sdk.trace.export import SpanExportResult
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+from starlette.types import ASGIApp
+from starlette.types import Message
+from starlette.types import Receive
+from starlette.types import Scope
+from starlette.types import Send
+
+from .settings import settings
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """Append finished spans to a file, one JSON object per line."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = "".join(span.to_json(indent=None) + "\n" for span in spans)
+        with self.lock, self.path.open("a") as file:
+            file.write(lines)
+        return SpanExportResult.SUCCESS
+
+
+tracer_provider = TracerProvider(resource=Resource.create({"service.name": "registry"}))
+span_exporter: SpanExporter | None = None
+
+if settings.trace_exporter == "file":
+    settings.log_dir.mkdir(parents=True, exist_ok=True)
+    span_exporter = JsonLinesSpanExporter(settings.log_dir / "registry-traces.jsonl")
+    tracer_provider.add_span_processor(BatchSpanProcessor(span_exporter))
+elif settings.trace_exporter == "memory":
+    span_exporter = InMemorySpanExporter()
+    tracer_provider.add_span_processor(SimpleSpanProcessor(span_exporter))
+
+tracer = tracer_provider.get_tracer("registry")
+
+
+class TracingMiddleware:
+    """Open a server span per HTTP request, continuing the caller's trace."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        carrier = {
+            name.decode("latin-1"): value.decode("latin-1")
+            for name, value in scope["headers"]
+        }
+        with tracer.start_as_current_span(
+            f"{scope['method']} {scope['path']}",
+            context=extract(carrier),
+            kind=trace.SpanKind.SERVER,
+            attributes={"http.method": scope["method"]},
+        ) as span:
+
+            async def send_with_status(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                if (route := scope.get("route")) is not None:
+                    span.update_name(f"{scope['method']} {route.path}")
+                    span.set_attribute("http.route", route.path)
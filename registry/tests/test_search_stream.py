@@ -0,0 +1,14 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from registry.src.main import app
+from registry.src.settings import settings
+
+
+def test_stream_rejects_query_over_prompt_budget(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "search_prompt_tokens", 500)
+    query = "word " * 1000
+    response = TestClient(app).get("/servers/search/stream", params=dict(query=query))
+    assert response.status_code == 400
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Compare the CPU cost of FastAPI's default response path with the registry's
+TypeAdapter-based one for a page of servers with large tool schemas.
+
+Run from the repository root with the registry environment configured:
+    PYTHONPATH=. python scripts/benchmark-serialization.py
+"""
+import argparse
+import asyncio
+import time
+from collections.abc import Callable
+from types import SimpleNamespace
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from starlette.requests import Request
+from starlette.responses import Response
+
+from registry.src.responses import json_response
+from registry.src.servers.schemas import ServerWithTools
+
+
+def make_servers(count: int, tools: int, properties: int) -> list[SimpleNamespace]:
+    input_schema = {
+        "type": "object",
+        "properties": {
+            f"argument_{index}": {
+                "type": "string",
+                "description": f"Description of argument number {index}",
+            }
+            for index in range(properties)
+        },
+        "required": [f"argument_{index}" for index in range(properties // 2)],
+    }
+    return [
+        SimpleNamespace(
+            id=server,
+            name=f"server-{server}",
+            description=f"Description of server number {server}",
+            url=f"http://server-{server}/sse",
+            logo=None,
+            tools=[
+                SimpleNamespace(
+                    name=f"tool-{tool}",
+                    description=f"Description of tool number {tool}",
+                    input_schema=input_schema,
+                )
+                for tool in range(tools)
+            ],
+        )
+        for server in range(count)
+    ]
+
+
+def make_request(accept_encoding: str) -> Request:
+    headers = [(b"accept-encoding", accept_encoding.encode())]
+    return Request({"type": "http", "method": "GET", "headers": headers})
+
+
+def measure(name: str, func: Callable[[], Any], repeat: int) -> float:
+    func()
+    started = time.process_time()
+    for _ in range(repeat):
+        func()
+    per_request = (time.process_time() - started) / repeat * 1000
+    print(f"{name:<32} {per_request:8.2f} ms CPU/request")
+    return per_request
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark response serialization")
+    parser.add_argument("--servers", type=int, default=50, help="Servers per page")
+    parser.add_argument("--tools", type=int, default=20, help="Tools per server")
+    parser.add_argument(
+        "--properties", type=int, default=20, help="Properties per tool schema"
+    )
+    parser.add_argument("--repeat", type=int, default=50, help="Requests to time")
+    args = parser.parse_args()
+
+    servers = make_servers(args.servers, args.tools, args.properties)
+    field = create_model_field("Response", list[ServerWithTools], mode="serialization")
+
+    def default_path() -> None:
+        content = asyncio.run(serialize_response(field=field, response_content=servers))
+        JSONResponse(content)
+
+    def fast_path(accept_encoding: str) -> Callable[[], Response]:
+        request = make_request(accept_encoding)
+        return lambda: json_response(
+            request, Response(), servers, list[ServerWithTools]
+        )
+
+    body = fast_path("identity")().body
+    print(f"{len(servers)} servers, {len(body) / 1024:.0f} KiB of JSON\n")
+    baseline = measure("FastAPI response_model", default_path, args.repeat)
+    fast = measure("TypeAdapter", fast_path("identity"), args.repeat)
+    compressed = measure("TypeAdapter + gzip", fast_path("gzip"), args.repeat)
+    print(f"\nCPU reduction without compression: {1 - fast / baseline:.0%}")
+    print(f"CPU reduction with compression:    {1 - compressed / baseline:.0%}")
+
+
+if __name__ == "__main__":
+    main()
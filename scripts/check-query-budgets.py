@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Check that the registry's endpoints stay within their query budgets.
+
+Every case below sends one request to the app in-process and counts the SQL
+statements it sends to the database. The script exits with status 1 if any
+endpoint sends more statements than its budget, so an N+1 query introduced
+in a change fails CI. Writes are charged for the catalogue refresh
+they trigger. Endpoints that call MCP servers or the LLM (creating or
+updating servers and search) are not checked.
+
+Run from the repository root against a disposable database at the latest
+migration:
+    PYTHONPATH=. python scripts/check-query-budgets.py
+"""
+import asyncio
+import sys
+from dataclasses import dataclass
+
+from httpx import ASGITransport
+from httpx import AsyncClient
+from sqlalchemy import text
+
+from registry.src.database.query_counter import QueryBudgetExceededError
+from registry.src.database.query_counter import QueryCounter
+from registry.src.database.session import async_engine
+from registry.src.database.session import replica_engine
+from registry.src.database.session import session_maker
+from registry.src.main import app
+from registry.src.search.catalogue import search_catalogue
+
+SERVERS = 30
+TOOLS_PER_SERVER = 5
+
+
+@dataclass
+class Case:
+    method: str
+    path: str
+    budget: int
+    status: int = 200
+
+
+def get_cases(ids: list[int]) -> dict[str, Case]:
+    id = ids[len(ids) // 2]
+    many = "&".join(f"ids={id}" for id in ids[:20])
+    # Cached reads also check the catalogue or server version for conditional requests
+    return {
+        "get server": Case("GET", f"/servers/{id}", 3),
+        "get server without tools": Case("GET", f"/servers/{id}?tools=none", 2),
+        "get servers by ids": Case("GET", f"/servers?{many}", 3),
+        "list servers": Case("GET", "/servers/?size=20", 4),
+        "list servers without tools": Case("GET", "/servers/?size=20&tools=none", 3),
+        "servers page": Case("GET", "/servers/cursor?size=20", 3),
+        "servers page with total": Case(
+            "GET", "/servers/cursor?size=20&include_total=true", 4
+        ),
+        "lookup servers": Case("GET", "/servers/lookup?q=budget", 2),
+        "tool refresh": Case("GET", f"/servers/{id}/refresh", 1, status=404),
+        "delete server": Case("DELETE", f"/servers/{id}", 8),
+    }
+
+
+async def seed() -> list[int]:
+    async with session_maker() as session:
+        result = await session.execute(
+            text(
+                "INSERT INTO server (url, name, description) "
+                "SELECT 'http://budget-' || i || '.local/sse', 'budget-' || i, "
+                "'Budget server number ' || i FROM generate_series(1, :servers) i "
+                "RETURNING id"
+            ),
+            dict(servers=SERVERS),
+        )
+        ids = sorted(result.scalars())
+        await session.execute(
+            text(
+                "INSERT INTO tool (name, description, input_schema, server_id) "
+                "SELECT 'tool-' || t, 'Budget tool number ' || t, '{}'::jsonb, s.id "
+                "FROM server s, generate_series(1, :tools) t "
+                "WHERE s.name LIKE 'budget-%'"
+            ),
+            dict(tools=TOOLS_PER_SERVER),
+        )
+        await session.commit()
+    return ids
+
+
+async def clean() -> None:
+    async with session_maker() as session:
+        await session.execute(text("DELETE FROM server WHERE name LIKE 'budget-%'"))
+        await session.commit()
+
+
+async def run_case(client: AsyncClient, name: str, case: Case) -> bool:
+    with QueryCounter() as counter:
+        response = await client.request(case.method, case.path)
+        # Writes refresh the catalogue once committed, which counts towards them
+        await asyncio.gather(*search_catalogue.tasks)
+    if response.status_code != case.status:
+        print(f"FAIL {name}: {response.status_code} {response.text}")
+        return False
+    try:
+        counter.assert_at_most(case.budget)
+    except QueryBudgetExceededError as error:
+        print(f"FAIL {name}: {error}")
+        return False
+    print(f"ok   {name} ({counter.count}/{case.budget} queries)")
+    return True
+
+
+async def main() -> None:
+    if replica_engine is not None:
+        sys.exit("Unset POSTGRES_REPLICA_HOST, queries are counted on the primary")
+    await clean()
+    ids = await seed()
+    await search_catalogue.load()
+    results = []
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            for name, case in get_cases(ids).items():
+                results.append(await run_case(client, name, case))
+    finally:
+        await clean()
+        await async_engine.dispose()
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
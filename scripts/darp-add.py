@@ -8,14 +8,26 @@ import json
 import requests
 
 default_registry_url: str = "http://localhost:80"
+default_chunk_size: int = 100
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Add a new MCP server to the registry")
-    parser.add_argument("--url", required=True, help="Endpoint URL for the server")
-    parser.add_argument("--name", required=True, help="Unique server name")
-    parser.add_argument("--description", required=True, help="Server description")
+    parser.add_argument("--url", help="Endpoint URL for the server")
+    parser.add_argument("--name", help="Unique server name")
+    parser.add_argument("--description", help="Server description")
     parser.add_argument("--logo", default=None, help="Logo URL")
+    parser.add_argument(
+        "--from-file",
+        default=None,
+        help="JSON file with a list of servers (name, description, url, logo)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=default_chunk_size,
+        help="Servers sent per bulk request with --from-file",
+    )
     parser.add_argument("--verbose", action="store_true", help="Verbose output")
     parser.add_argument(
         "--registry-url", default=default_registry_url, help="Registry API endpoint URL"
@@ -23,6 +35,17 @@ def main() -> None:
 
     args = parser.parse_args()
 
+    if args.from_file:
+        add_servers_from_file(
+            args.from_file,
+            args.registry_url,
+            chunk_size=args.chunk_size,
+            verbose=args.verbose,
+        )
+        return
+    if not (args.url and args.name and args.description):
+        parser.error("--url, --name and --description are required without --from-file")
+
     server_data = {
         "name": args.name,
         "description": args.description,
@@ -36,5 +59,28 @@ def main() -> None:
         print(json.dumps(response.json(), indent=2))
 
 
+def add_servers_from_file(
+    path: str,
+    registry_url: str,
+    chunk_size: int = default_chunk_size,
+    verbose: bool = False,
+) -> None:
+    with open(path) as file:
+        servers_data = json.load(file)
+
+    # Each chunk is committed on its own, so a failure loses one chunk at most
+    for start in range(0, len(servers_data), chunk_size):
+        chunk = servers_data[start : start + chunk_size]
+        response = requests.post(f"{registry_url}/servers/bulk", json=chunk)
+        response.raise_for_status()
+        results = response.json()
+        if verbose:
+            print(json.dumps(results, indent=2))
+            continue
+        for result in results:
+            error = f" ({result['error']})" if result["error"] else ""
+            print(f"{result['status']}: {result['name']} {result['url']}{error}")
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Check that the registry's repository queries use indexes on a large catalogue.
+
+Every case below runs repository methods inside a transaction that is rolled
+back. It records the SQL they send and runs EXPLAIN for each statement. The
+script exits with status 1 if any plan reads `server` or `tool` with a
+sequential scan. Queries that read the whole catalogue by design
+(`get_search_servers` and `get_embeddings` without `since`,
+`get_server_ids`, `count_servers`) are not checked.
+
+Run from the repository root against a disposable database at the latest
+migration:
+    PYTHONPATH=. python scripts/explain-queries.py --seed
+"""
+import argparse
+import asyncio
+import json
+import sys
+from collections.abc import Awaitable
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from registry.src.database.session import async_engine
+from registry.src.database.session import session_maker
+from registry.src.servers.repository import ServerRepository
+from registry.src.servers.schemas import ServerUpdate
+from registry.src.servers.schemas import Tool
+from registry.src.servers.schemas import ToolFields
+
+CHECKED_TABLES = {"server", "tool"}
+
+# Cases get the id and the number of a synthetic server in the middle of the table
+Case = Callable[[ServerRepository, int, int], Awaitable[Any]]
+
+
+def url(number: int) -> str:
+    return f"http://bench-{number}.local/sse"
+
+
+CASES: dict[str, Case] = {
+    "find_servers": lambda repo, id, number: repo.find_servers(
+        name=f"Bench-{number}", url=url(number)
+    ),
+    "get_server": lambda repo, id, number: repo.get_server(id),
+    "get_server(tools=name)": lambda repo, id, number: repo.get_server(
+        id, tools=ToolFields.name
+    ),
+    "get_servers": lambda repo, id, number: repo.get_servers(list(range(id, id + 20))),
+    "find_existing_servers": lambda repo, id, number: repo.find_existing_servers(
+        names=[f"bench-{number}"], urls=[url(number + 1)]
+    ),
+    "get_servers_page": lambda repo, id, number: repo.get_servers_page(50, after=id),
+    "get_servers_page(before)": lambda repo, id, number: repo.get_servers_page(
+        50, before=id
+    ),
+    # Every synthetic name is similar to "bench-<number>", so it would
+    # rightly be answered by a sequential scan
+    "lookup_servers": lambda repo, id, number: repo.lookup_servers(
+        "weather forecast", 10
+    ),
+    "get_servers_by_urls": lambda repo, id, number: repo.get_servers_by_urls(
+        [url(number), url(number + 1)]
+    ),
+    # Synthetic servers are at catalogue version 0, so nothing changed since
+    "get_search_servers(since)": lambda repo, id, number: repo.get_search_servers(
+        since=0
+    ),
+    "get_embeddings(since)": lambda repo, id, number: repo.get_embeddings(since=0),
+    "get_tools": lambda repo, id, number: repo.get_tools(id),
+    "find_tool_refresh": lambda repo, id, number: repo.find_tool_refresh(id),
+    "update_server": lambda repo, id, number: repo.update_server(
+        id,
+        ServerUpdate(),
+        [
+            Tool(name="tool-1", description="Changed tool", input_schema={}),
+            Tool(name="tool-new", description="New tool", input_schema={}),
+        ],
+    ),
+    "lock_server": lambda repo, id, number: repo.lock_server(id, url(number)),
+    "delete_server": lambda repo, id, number: repo.delete_server(id),
+}
+
+# ON DELETE CASCADE runs this inside a trigger, where EXPLAIN cannot see it
+CASCADE_QUERY = "DELETE FROM ONLY tool WHERE server_id = $1"
+
+
+async def seed(session: AsyncSession, servers: int, tools_per_server: int) -> None:
+    print(f"Seeding {servers} servers with {tools_per_server} tools each")
+    await session.execute(
+        text(
+            "INSERT INTO server (url, name, description) "
+            "SELECT 'http://bench-' || i || '.local/sse', 'bench-' || i, "
+            "'Synthetic server number ' || i FROM generate_series(1, :servers) i"
+        ),
+        dict(servers=servers),
+    )
+    await session.execute(
+        text(
+            "INSERT INTO tool (name, description, input_schema, server_id) "
+            "SELECT 'tool-' || t, 'Synthetic tool number ' || t, '{}'::jsonb, s.id "
+            "FROM server s, generate_series(1, :tools) t "
+            "WHERE s.name LIKE 'bench-%'"
+        ),
+        dict(tools=tools_per_server),
+    )
+    await session.commit()
+    async with async_engine.connect() as connection:
+        connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+        # Also flushes the GIN pending lists, as autovacuum would
+        await connection.execute(text("VACUUM ANALYZE server"))
+        await connection.execute(text("VACUUM ANALYZE tool"))
+
+
+def find_seq_scans(plan: dict) -> list[str]:
+    scans = []
+    if plan["Node Type"] == "Seq Scan" and plan["Relation Name"] in CHECKED_TABLES:
+        scans.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        scans.extend(find_seq_scans(child))
+    return scans
+
+
+async def explain(session: AsyncSession, statement: str, parameters: Any) -> list[str]:
+    connection = await session.connection()
+    result = await connection.exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {statement}", parameters
+    )
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return find_seq_scans(plan[0]["Plan"])
+
+
+async def run_case(
+    session: AsyncSession, name: str, case: Case, id: int, number: int
+) -> bool:
+    statements: list[tuple[str, Any]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany) -> None:
+        if not executemany:
+            statements.append((statement, parameters))
+
+    sync_engine = async_engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", record)
+    try:
+        async with session.begin_nested():
+            await case(ServerRepository(session), id, number)
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", record)
+
+    if name == "delete_server":
+        statements.append((CASCADE_QUERY, (id,)))
+    failed = False
+    for statement, parameters in statements:
+        if statement.lstrip().upper().startswith(("SAVEPOINT", "RELEASE", "ROLLBACK")):
+            continue
+        if scans := await explain(session, statement, parameters):
+            failed = True
+            print(f"FAIL {name}: sequential scan on {', '.join(scans)}\n{statement}")
+    if not failed:
+        print(f"ok   {name} ({len(statements)} statements)")
+    return not failed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="EXPLAIN the repository queries")
+    parser.add_argument(
+        "--seed", action="store_true", help="Insert a synthetic catalogue first"
+    )
+    parser.add_argument("--servers", type=int, default=50_000)
+    parser.add_argument("--tools-per-server", type=int, default=20)
+    args = parser.parse_args()
+
+    async with session_maker() as session:
+        if args.seed:
+            await seed(session, args.servers, args.tools_per_server)
+        number = args.servers // 2
+        id = await session.scalar(
+            text("SELECT id FROM server WHERE name = :name"),
+            dict(name=f"bench-{number}"),
+        )
+        if id is None:
+            sys.exit("No synthetic catalogue found, run with --seed")
+
+        results = []
+        try:
+            for name, case in CASES.items():
+                results.append(await run_case(session, name, case, id, number))
+        finally:
+            await session.rollback()
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())